@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+博客核心模块
+publish.py、publish_new.py、publish_gui.py 和 import_posts.py 共用的文章数据结构和操作：
+1. PostMeta：一篇文章的元数据（不含正文），用__slots__节省内存
+2. PostCatalog：按列存储的文章目录。标签和心情驻留为整数编号，日期存成整数数组，
+   按ID查找是O(1)，另有按标签和按日期的二级索引；10万篇文章的元数据只占几十MB
+3. Front Matter解析、文章ID生成、默认值、保存和发布流程
+
+本模块只导入标准库中的轻量模块，规范化、构建等较重的模块在第一次用到时才导入，
+只查询目录的脚本启动很快。
+"""
+
+import re
+import sys
+import random
+import datetime
+import argparse
+import subprocess
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from pathlib import Path
+
+from index_store import iter_index, date_key, normalize_entry, POST_ONLY_KEYS, INDEX_NDJSON
+
+# ========== 配置区域 ==========
+POSTS_DIR = Path("./posts")  # 存放文章JSON的文件夹
+DEFAULT_READ_TIME = "3分钟阅读"
+DEFAULT_MOOD = "平静"
+DEFAULT_TAGS = ["随笔"]
+MAX_SLUG_LENGTH = 50  # 标题转换后超过这个长度就改用随机编号
+LIST_KEYS = {'tags', 'categories'}  # Front Matter中值为列表的键，其他键的值都是字符串
+
+# PostMeta的属性 -> 索引中的键
+FIELD_KEYS = {
+    'id': 'id', 'title': 'title', 'date': 'date', 'read_time': 'readTime',
+    'mood': 'mood', 'tags': 'tags', 'summary': 'summary',
+}
+
+
+# =============================
+
+# ---------- 文章元数据 ----------
+
+class PostMeta:
+    """一篇文章的元数据，对应索引中的一行"""
+
+    __slots__ = ('id', 'title', 'date', 'read_time', 'mood', 'tags', 'summary', 'extra')
+
+    def __init__(self, post_id, title='', date='', read_time='', mood='', tags=(), summary='',
+                 extra=None):
+        self.id = post_id
+        self.title = title
+        self.date = date
+        self.read_time = read_time
+        self.mood = mood
+        self.tags = tuple(tags)
+        self.summary = summary
+        self.extra = extra  # 其他键（如keywords），没有时为None
+
+    @classmethod
+    def from_dict(cls, data):
+        """从索引条目或文章JSON创建（正文等文章详情会被忽略）"""
+        known = set(FIELD_KEYS.values()) | POST_ONLY_KEYS
+        extra = {key: value for key, value in data.items() if key not in known}
+        return cls(data['id'], data.get('title', ''), data.get('date', ''),
+                   data.get('readTime', ''), data.get('mood', ''), data.get('tags', ()),
+                   data.get('summary', ''), extra or None)
+
+    def to_dict(self):
+        """转换为索引条目（键按索引的固定顺序排列）"""
+        data = {key: getattr(self, attr) for attr, key in FIELD_KEYS.items()}
+        data['tags'] = list(self.tags)
+        if self.extra:
+            data.update(self.extra)
+        return normalize_entry(data)
+
+    def date_key(self):
+        return date_key({'date': self.date, 'id': self.id})
+
+    def __eq__(self, other):
+        if not isinstance(other, PostMeta):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"PostMeta({self.id!r}, {self.title!r}, {self.date!r})"
+
+
+def _date_number(post):
+    """2024年5月22日 -> 20240522（与index_store.date_key的解析规则一致）"""
+    year, month, day, _ = date_key(post)
+    return year * 10000 + month * 100 + day
+
+
+class PostCatalog:
+    """
+    按列存储的文章目录：每个字段一列，一篇文章是所有列中的同一行。
+    标签和心情存为驻留表中的编号，日期存为YYYYMMDD整数，
+    每篇的标签按CSR格式（偏移数组 + 编号数组）存放。
+    删除和替换只把旧行标记为无效，行号不会复用
+    """
+
+    def __init__(self):
+        self._ids = []
+        self._titles = []
+        self._summaries = []
+        self._date_texts = []  # 驻留的原始日期文本
+        self._read_times = []  # 驻留的阅读时长文本
+        self._dates = array('I')  # YYYYMMDD
+        self._moods = array('I')  # 心情编号
+        self._tag_offsets = array('I', [0])  # 第i行的标签是 _tag_codes[offsets[i]:offsets[i+1]]
+        self._tag_codes = array('I')
+        self._extras = {}  # 行号 -> 其他键（大多数文章没有）
+        self._alive = bytearray()
+        self._row_of = {}  # ID -> 行号
+
+        self._tag_names, self._tag_lookup = [], {}
+        self._mood_names, self._mood_lookup = [], {}
+
+        # 二级索引，第一次查询时建立，修改后失效
+        self._tag_index = None  # 标签编号 -> 行号数组
+        self._date_order = None  # 按 (日期, ID) 排好序的行号
+        self._date_sorted = None  # 与 _date_order 对应的日期，用于二分查找
+
+    @classmethod
+    def load(cls, path=INDEX_NDJSON):
+        """从索引流式读取所有文章"""
+        catalog = cls()
+        for entry in iter_index(path):
+            catalog.add(entry)
+        return catalog
+
+    @staticmethod
+    def _intern(names, lookup, name):
+        code = lookup.get(name)
+        if code is None:
+            code = lookup[name] = len(names)
+            names.append(sys.intern(name))
+        return code
+
+    def _invalidate(self):
+        self._tag_index = self._date_order = self._date_sorted = None
+
+    def add(self, post):
+        """新增或替换一篇文章（PostMeta或索引条目dict）"""
+        if isinstance(post, dict):
+            post = PostMeta.from_dict(post)
+        old_row = self._row_of.get(post.id)
+        if old_row is not None:
+            self._alive[old_row] = 0
+            self._extras.pop(old_row, None)
+
+        row = len(self._ids)
+        self._ids.append(post.id)
+        self._titles.append(post.title)
+        self._summaries.append(post.summary)
+        self._date_texts.append(sys.intern(post.date))
+        self._read_times.append(sys.intern(post.read_time))
+        self._dates.append(_date_number({'date': post.date, 'id': post.id}))
+        self._moods.append(self._intern(self._mood_names, self._mood_lookup, post.mood))
+        for tag in post.tags:
+            self._tag_codes.append(self._intern(self._tag_names, self._tag_lookup, tag))
+        self._tag_offsets.append(len(self._tag_codes))
+        if post.extra:
+            self._extras[row] = post.extra
+        self._alive.append(1)
+        self._row_of[post.id] = row
+        self._invalidate()
+
+    def remove(self, post_id):
+        """删除一篇文章，返回是否找到"""
+        row = self._row_of.pop(post_id, None)
+        if row is None:
+            return False
+        self._alive[row] = 0
+        self._extras.pop(row, None)
+        self._invalidate()
+        return True
+
+    def _tags_of(self, row):
+        start, end = self._tag_offsets[row], self._tag_offsets[row + 1]
+        return tuple(self._tag_names[code] for code in self._tag_codes[start:end])
+
+    def _meta(self, row):
+        return PostMeta(self._ids[row], self._titles[row], self._date_texts[row],
+                        self._read_times[row], self._mood_names[self._moods[row]],
+                        self._tags_of(row), self._summaries[row], self._extras.get(row))
+
+    def __len__(self):
+        return len(self._row_of)
+
+    def __contains__(self, post_id):
+        return post_id in self._row_of
+
+    def __iter__(self):
+        """按加入的顺序产出（从索引加载时即日期升序）"""
+        for row, alive in enumerate(self._alive):
+            if alive:
+                yield self._meta(row)
+
+    def get(self, post_id):
+        """按ID查找，O(1)；不存在时返回None"""
+        row = self._row_of.get(post_id)
+        return None if row is None else self._meta(row)
+
+    def tags(self):
+        """所有出现过的标签"""
+        return list(self.tag_counts())
+
+    def tag_counts(self):
+        """每个标签的文章数"""
+        index = self._build_tag_index()
+        return Counter({self._tag_names[code]: len(rows) for code, rows in index.items() if rows})
+
+    def _build_tag_index(self):
+        if self._tag_index is None:
+            index = {}
+            for row, alive in enumerate(self._alive):
+                if alive:
+                    start, end = self._tag_offsets[row], self._tag_offsets[row + 1]
+                    for code in set(self._tag_codes[start:end]):
+                        index.setdefault(code, array('I')).append(row)
+            self._tag_index = index
+        return self._tag_index
+
+    def _build_date_index(self):
+        if self._date_order is None:
+            rows = [row for row, alive in enumerate(self._alive) if alive]
+            rows.sort(key=lambda row: (self._dates[row], self._ids[row]))
+            self._date_order = array('I', rows)
+            self._date_sorted = array('I', (self._dates[row] for row in rows))
+        return self._date_order
+
+    def with_tag(self, tag):
+        """带某个标签的文章，最新的在前"""
+        code = self._tag_lookup.get(tag)
+        rows = self._build_tag_index().get(code, ())
+        rows = sorted(rows, key=lambda row: (self._dates[row], self._ids[row]), reverse=True)
+        return [self._meta(row) for row in rows]
+
+    def between(self, start, end):
+        """
+        日期在 [start, end] 之间的文章，按日期升序。
+        start/end 可以是 datetime.date 或 YYYYMMDD 整数
+        """
+        if isinstance(start, datetime.date):
+            start = start.year * 10000 + start.month * 100 + start.day
+        if isinstance(end, datetime.date):
+            end = end.year * 10000 + end.month * 100 + end.day
+        order = self._build_date_index()
+        lo = bisect_left(self._date_sorted, start)
+        hi = bisect_right(self._date_sorted, end)
+        return [self._meta(order[i]) for i in range(lo, hi)]
+
+    def newest(self, count=None):
+        """最新的count篇文章（不指定时为全部），最新的在前"""
+        order = self._build_date_index()
+        stop = len(order) if count is None else min(count, len(order))
+        return [self._meta(order[-1 - i]) for i in range(stop)]
+
+
+# ---------- 解析与生成 ----------
+
+def _unquote(value):
+    """去掉成对包在两端的引号"""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '\'"':
+        return value[1:-1]
+    return value
+
+
+def _parse_list(value):
+    """[生活, 随笔] 或 生活, 随笔 -> ['生活', '随笔']"""
+    value = value.strip()
+    if value.startswith('[') and value.endswith(']'):
+        value = value[1:-1]
+    return [_unquote(v) for v in value.split(',') if v.strip()]
+
+
+def parse_front_matter(content, required=True):
+    """
+    解析Markdown文件顶部的Front Matter，返回 (元数据, 正文)。格式示例：
+    ---
+    title: 我的新文章
+    date: 2024年5月22日
+    readTime: 3分钟阅读
+    mood: 开心
+    tags: [生活, 随笔]
+    summary: 这是一篇文章的简要摘要。
+    ---
+    只有LIST_KEYS中的键（tags、categories）解析为列表，可以写成 [a, b]、a, b，
+    或Hexo/Jekyll常用的多行列表（- a）；其他键的值都是字符串，空值为 ''。
+    没有Front Matter时，required为True则抛出ValueError，否则返回 ({}, 全文)
+    """
+    content = content.lstrip('\ufeff').replace('\r\n', '\n')
+    match = re.match(r'---[ \t]*\n(.*?)\n---[ \t]*(?:\n|$)', content, re.DOTALL)
+    if not match:
+        if required:
+            raise ValueError("Markdown文件必须以Front Matter（以---开始）开头")
+        return {}, content
+
+    metadata = {}
+    key = None
+    for line in match.group(1).split('\n'):
+        item = re.match(r'\s*-\s+(.*)$', line)
+        if item and key:
+            # 多行列表只跟在空值的键后面
+            if metadata[key] == '':
+                metadata[key] = []
+            if isinstance(metadata[key], list):
+                value = item.group(1)
+                # Hexo的多级分类写成 - [父, 子]
+                metadata[key].append(_parse_list(value) if key in LIST_KEYS and value.strip().startswith('[')
+                                     else _unquote(value))
+        elif ':' in line and not line[0].isspace():
+            key, value = line.split(':', 1)
+            key = key.strip()
+            if key in LIST_KEYS and value.strip():
+                metadata[key] = _parse_list(value)
+            else:
+                metadata[key] = _unquote(value)
+    return metadata, content[match.end():].strip()
+
+
+def slugify(text):
+    """去掉标点等特殊字符（保留中文），空白和连字符合并为一个连字符"""
+    slug = re.sub(r'[^\w\s-]', '', text).strip().lower()
+    return re.sub(r'[-\s]+', '-', slug)
+
+
+def generate_post_id(title, date=None):
+    """
+    根据标题生成文章ID（用于文件名）
+    格式：YYYY-MM-DD-标题，标题转换后为空或太长时用随机编号
+    """
+    date = date or datetime.date.today()
+    slug = slugify(title)
+    if not slug or len(slug) > MAX_SLUG_LENGTH:
+        slug = f"post-{random.randint(1000, 9999)}"
+    return f"{date.strftime('%Y-%m-%d')}-{slug}"
+
+
+def parse_date(text):
+    """解析 2024年5月22日、2024-05-22、2024/5/22 10:00:00 等写法，失败时返回None"""
+    match = re.match(r'\s*(\d{4})(?:年|[-/.])(\d{1,2})(?:月|[-/.])(\d{1,2})', str(text))
+    try:
+        return datetime.date(*(int(x) for x in match.groups()))
+    except (AttributeError, ValueError):
+        return None
+
+
+def format_date_cn(date=None):
+    """2024年5月22日（不用strftime的%-m，Windows上也能用）"""
+    date = date or datetime.date.today()
+    return f"{date.year}年{date.month}月{date.day}日"
+
+
+def apply_defaults(metadata):
+    """补全可选字段的默认值"""
+    if not metadata.get('date'):
+        metadata['date'] = format_date_cn()
+    if not metadata.get('readTime'):
+        metadata['readTime'] = DEFAULT_READ_TIME
+    if not metadata.get('mood'):
+        metadata['mood'] = DEFAULT_MOOD
+    if not metadata.get('tags'):
+        metadata['tags'] = list(DEFAULT_TAGS)
+    return metadata
+
+
+def new_post(post_id, metadata, body_html):
+    """组装一篇文章的完整JSON数据，正文会被规范化"""
+    from canonicalize import canonicalize_body, BODY_FORMAT
+
+    post = PostMeta(post_id, metadata['title'], metadata['date'], metadata['readTime'],
+                    metadata['mood'], metadata['tags'], metadata.get('summary', '')).to_dict()
+    post['body'] = canonicalize_body(body_html)
+    post['format'] = BODY_FORMAT
+    return post
+
+
+# ---------- 保存与发布 ----------
+
+def post_path(post_id):
+    return POSTS_DIR / f"{post_id}.json"
+
+
+def save_post_file(post):
+    """保存文章JSON，返回文件路径"""
+    from build import save_post
+
+    POSTS_DIR.mkdir(exist_ok=True)
+    path = post_path(post['id'])
+    save_post(post, path)
+    return path
+
+
+def publish_post(post):
+    """
+    发布一篇文章：保存文章JSON，更新索引（只改动NDJSON中的一行），
+    导出网站使用的索引和增量文件，再增量构建站点。返回需要提交的文件列表
+    """
+    from build import rebuild_site
+    from index_store import upsert_entry
+    from index_versions import publish_index
+
+    path = save_post_file(post)
+    upsert_entry(post)
+    index_files = publish_index()
+    rebuilt_files = rebuild_site()
+    return [str(p) for p in dict.fromkeys([path, INDEX_NDJSON] + index_files + rebuilt_files)]
+
+
+def push_to_github(publish_files, commit_msg):
+    """提交并推送发布的文件，返回是否成功"""
+    print("\n🚀 正在推送到GitHub...")
+    try:
+        subprocess.run(['git', 'add'] + [str(p) for p in publish_files],
+                       check=True, capture_output=True, text=True)
+        subprocess.run(['git', 'commit', '-m', commit_msg],
+                       check=True, capture_output=True, text=True)
+        result = subprocess.run(['git', 'push'], capture_output=True, text=True)
+
+        if result.returncode == 0:
+            print("✅ 已成功推送到GitHub！")
+            print("📢 等待约1-2分钟，GitHub Pages会自动部署更新。")
+            print(f"🌐 访问: https://你的用户名.github.io")
+            return True
+        print("⚠️  推送失败，请检查Git配置:")
+        print(result.stderr[:200])  # 只显示前200字符
+        print_manual_push(publish_files, commit_msg)
+
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Git操作失败: {e}")
+        print("请确保：")
+        print("1. 当前目录是Git仓库")
+        print("2. Git已正确配置")
+        print("3. 你有推送权限")
+    except FileNotFoundError:
+        print("❌ Git未安装或不在PATH中")
+        print("你可以稍后手动推送")
+    return False
+
+
+def print_manual_push(publish_files, commit_msg):
+    print("你可以稍后手动执行以下命令推送到GitHub：")
+    print(f"  git add {' '.join(str(p) for p in publish_files)}")
+    print(f'  git commit -m "{commit_msg}"')
+    print("  git push")
+
+
+# ---------- 内存与速度测试 ----------
+
+def _synthetic_posts(count, seed=1):
+    rng = random.Random(seed)
+    tags = [f"标签{i}" for i in range(200)]
+    moods = ["开心", "平静", "思考", "兴奋", "怀念", "期待", "放松", "其他"]
+    for i in range(count):
+        year, month, day = rng.randint(2010, 2026), rng.randint(1, 12), rng.randint(1, 28)
+        yield {
+            'id': f"{year}-{month:02d}-{day:02d}-post-{i}",
+            'title': f"第{i}篇文章的标题",
+            'date': f"{year}年{month}月{day}日",
+            'readTime': f"{rng.randint(1, 15)}分钟阅读",
+            'mood': rng.choice(moods),
+            'tags': rng.sample(tags, rng.randint(1, 4)),
+            'summary': f"这是第{i}篇文章的摘要，" + "内容" * rng.randint(10, 40),
+        }
+
+
+def benchmark(count):
+    """用随机生成的文章测量目录的内存占用和查询速度"""
+    import time
+    import tracemalloc
+
+    entries = list(_synthetic_posts(count))
+    started = time.perf_counter()
+    catalog = PostCatalog()
+    for entry in entries:
+        catalog.add(entry)
+    load_time = time.perf_counter() - started
+
+    # 内存单独再加载一次测量（tracemalloc会明显拖慢加载），文章边生成边加入
+    del catalog, entries
+    tracemalloc.start()
+    catalog = PostCatalog()
+    for entry in _synthetic_posts(count):
+        catalog.add(entry)
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    ids = [catalog._ids[i] for i in range(0, count, max(1, count // 1000))]
+    started = time.perf_counter()
+    for post_id in ids:
+        catalog.get(post_id)
+    lookup_time = (time.perf_counter() - started) / len(ids)
+
+    started = time.perf_counter()
+    tagged = catalog.with_tag("标签7")
+    recent = catalog.between(datetime.date(2026, 1, 1), datetime.date(2026, 12, 31))
+    query_time = time.perf_counter() - started
+
+    print(f"📊 {count} 篇文章")
+    print(f"  内存: {memory / 1024 / 1024:.1f} MB（平均每篇 {memory / max(count, 1):.0f} 字节）")
+    print(f"  加载: {load_time:.2f} 秒")
+    print(f"  按ID查找: {lookup_time * 1e6:.1f} 微秒")
+    print(f"  首次按标签和日期查询（含建立二级索引）: {query_time * 1000:.0f} 毫秒"
+          f"（{len(tagged)} 篇带标签，{len(recent)} 篇在2026年）")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='博客核心模块')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    bench = subparsers.add_parser('bench', help='测量文章目录的内存占用和查询速度')
+    bench.add_argument('--posts', type=int, default=100000, help='生成的文章数')
+    subparsers.add_parser('stats', help='显示当前索引的文章和标签统计')
+    args = parser.parse_args()
+
+    if args.command == 'bench':
+        benchmark(args.posts)
+    elif args.command == 'stats':
+        catalog = PostCatalog.load()
+        print(f"文章总数: {len(catalog)}篇")
+        for tag, count in catalog.tag_counts().most_common(10):
+            print(f"  {tag}: {count}篇")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+页面体积预算检查
+功能：根据HTML标签和JS中的fetch地址解析出每个页面要加载的全部资源
+（HTML、CSS、JS、索引、文章JSON、图片），统计原始字节数、gzip字节数和请求数，
+与 budget.json 中的预算比较，超出预算时以非零状态退出。
+文章页会逐篇统计，并标出明显比其他文章重的文章。
+"""
+
+import re
+import sys
+import glob
+import gzip
+import html
+import json
+import argparse
+import statistics
+from fnmatch import fnmatch
+from html.parser import HTMLParser
+from pathlib import Path
+
+from index_store import iter_index
+from build import POSTS_DIR, IMG_SRC_RE, load_post, is_external, local_path
+
+# ========== 配置区域 ==========
+BUDGET_FILE = Path("./budget.json")  # 预算配置
+PAGES = {'index': Path("./index.html"), 'post': Path("./post.html")}
+POST_URL_PATTERN = 'posts/{}.json'  # 文章页按文章ID代入的fetch地址
+
+
+# =============================
+
+class _PageParser(HTMLParser):
+    """收集页面中会被加载的资源"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.refs = []  # (类型, 地址)
+        self.prefetches = []
+        self.inline_scripts = []
+        self._in_script = False
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'link' and attrs.get('href'):
+            rel = (attrs.get('rel') or '').lower().split()
+            if 'stylesheet' in rel:
+                self.refs.append(('css', attrs['href']))
+            elif 'preload' in rel:
+                self.refs.append((attrs.get('as') or 'preload', attrs['href']))
+            elif 'prefetch' in rel:
+                self.prefetches.append(attrs['href'])
+        elif tag == 'script':
+            if attrs.get('src'):
+                self.refs.append(('js', attrs['src']))
+            elif (attrs.get('type') or 'text/javascript') in ('text/javascript', 'module'):
+                self._in_script = True
+        elif tag == 'img' and attrs.get('src'):
+            self.refs.append(('img', attrs['src']))
+
+    def handle_endtag(self, tag):
+        if tag == 'script':
+            self._in_script = False
+
+    def handle_data(self, data):
+        if self._in_script:
+            self.inline_scripts.append(data)
+
+
+def js_fetch_targets(js_text):
+    """
+    找出JS中fetch()请求的地址。字符串常量会被代入，
+    无法静态确定的部分（如文章ID）用 {} 表示
+    """
+    constants = dict(re.findall(r'''\b(?:const|let|var)\s+(\w+)\s*=\s*['"]([^'"]*)['"]''', js_text))
+    targets = []
+    for arg in re.findall(r'\bfetch\(\s*([^,)]+?)\s*[,)]', js_text):
+        if arg[0] in '\'"':
+            targets.append(arg[1:-1])
+        elif arg[0] == '`':
+            def substitute(match):
+                return constants.get(match.group(1).strip(), '{}')
+            targets.append(re.sub(r'\$\{([^}]*)\}', substitute, arg[1:-1]))
+        elif arg in constants:
+            targets.append(constants[arg])
+    return targets
+
+
+class Measurer:
+    """测量本地文件的原始字节数和gzip字节数（同一文件只测一次）"""
+
+    def __init__(self):
+        self._sizes = {}
+
+    def measure(self, path):
+        key = str(path)
+        if key not in self._sizes:
+            data = Path(path).read_bytes()
+            self._sizes[key] = (len(data), len(gzip.compress(data, compresslevel=6)))
+        return self._sizes[key]
+
+
+def resolve_target(pattern, post_id=None):
+    """
+    把含 {} 的fetch地址解析为具体文件：文章地址代入当前文章ID，
+    其他的（如索引分片）取磁盘上匹配的最大文件，按最坏情况计算
+    """
+    if '{}' not in pattern:
+        return pattern
+    if pattern == POST_URL_PATTERN:
+        return pattern.format(post_id) if post_id else None
+    matches = glob.glob(pattern.replace('{}', '*'))
+    return max(matches, key=lambda p: Path(p).stat().st_size) if matches else None
+
+
+def page_resources(page_path, measurer, post=None, exclude=()):
+    """
+    解析一个页面的依赖，返回资源列表 [(类型, 地址, 原始字节, gzip字节)]。
+    外部资源只计请求数，字节数记为None；exclude中是不计入的地址（可用通配符）
+    """
+    parser = _PageParser()
+    parser.feed(page_path.read_text(encoding='utf-8'))
+
+    refs = [('html', page_path.name)] + parser.refs
+    scripts = list(parser.inline_scripts)
+    for kind, url in parser.refs:
+        path = local_path(url) if kind == 'js' else None
+        if path is not None and path.is_file():
+            scripts.append(path.read_text(encoding='utf-8'))
+    for script in scripts:
+        for pattern in js_fetch_targets(script):
+            target = resolve_target(pattern, post and post['id'])
+            if target:
+                refs.append(('fetch', target))
+    if post is not None:
+        for match in IMG_SRC_RE.finditer(post.get('body', '')):
+            refs.append(('img', html.unescape(match.group(3))))
+
+    resources = []
+    seen = set()
+    for kind, url in refs:
+        key = url if is_external(url) else (local_path(url) or Path('.')).as_posix()
+        if key in seen or any(fnmatch(key, pattern) for pattern in exclude):
+            continue  # 同一地址浏览器只请求一次
+        seen.add(key)
+        if is_external(url):
+            resources.append((kind, url, None, None))
+        elif Path(key).is_file():
+            raw, gz = measurer.measure(key)
+            resources.append((kind, key, raw, gz))
+        else:
+            print(f"警告：{page_path.name} 引用的 {key} 不存在")
+    return resources
+
+
+def totals(resources):
+    """返回 (请求数, 原始字节数, gzip字节数)"""
+    return (len(resources),
+            sum(r[2] or 0 for r in resources),
+            sum(r[3] or 0 for r in resources))
+
+
+def over_budget(name, page_totals, budget):
+    """返回超出预算的说明列表"""
+    requests, raw, gz = page_totals
+    problems = []
+    for label, value, key in (('请求数', requests, 'requests'),
+                              ('原始字节', raw, 'bytes'),
+                              ('gzip字节', gz, 'gzip_bytes')):
+        limit = budget.get(key)
+        if limit is not None and value > limit:
+            problems.append(f"{name}: {label} {value} 超出预算 {limit}")
+    return problems
+
+
+def _kb(size):
+    return '外部' if size is None else f"{size / 1024:.1f} KB"
+
+
+def print_breakdown(resources):
+    for kind, url, raw, gz in resources:
+        gz_text = '' if gz is None else f"(gzip {_kb(gz)})"
+        print(f"    {kind:<8} {url:<48} {_kb(raw):>10} {gz_text}")
+
+
+def print_totals(page_totals):
+    requests, raw, gz = page_totals
+    print(f"  合计: {requests} 个请求, {_kb(raw)} (gzip {_kb(gz)})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查每个页面的字节数和请求数是否超出预算')
+    parser.add_argument('--config', '-c', default=str(BUDGET_FILE), help='预算配置文件')
+    parser.add_argument('--verbose', '-v', action='store_true', help='显示每篇文章的资源明细')
+    args = parser.parse_args()
+
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"❌ 无法读取预算配置 {args.config}: {e}")
+        sys.exit(2)
+
+    measurer = Measurer()
+    problems = []
+
+    # 1. 首页
+    index_budget = config.get('index', {})
+    resources = page_resources(PAGES['index'], measurer, exclude=set(index_budget.get('exclude', [])))
+    print(f"📄 {PAGES['index']}")
+    print_breakdown(resources)
+    index_totals = totals(resources)
+    print_totals(index_totals)
+    problems += over_budget(PAGES['index'].name, index_totals, index_budget)
+
+    # 2. 文章页：逐篇统计
+    post_budget = config.get('post', {})
+    exclude = set(post_budget.get('exclude', []))
+    rows = []
+    for entry in iter_index():
+        path = POSTS_DIR / f"{entry['id']}.json"
+        if not path.exists():
+            print(f"警告：索引中的文章 {path} 不存在，跳过")
+            continue
+        resources = page_resources(PAGES['post'], measurer, post=load_post(path), exclude=exclude)
+        rows.append((entry['id'], totals(resources), resources))
+
+    print(f"\n📄 {PAGES['post']}（共 {len(rows)} 篇文章）")
+    if rows:
+        median = statistics.median(row[1][1] for row in rows)
+        factor = config.get('outlier_factor', 3)
+        for post_id, post_totals, resources in rows:
+            requests, raw, gz = post_totals
+            flag = ' ⚠️ 异常' if median and raw > factor * median else ''
+            print(f"  {post_id:<40} {requests:>3} 个请求 {_kb(raw):>10} (gzip {_kb(gz)}){flag}")
+            if args.verbose:
+                print_breakdown(resources)
+            problems += over_budget(f"post.html?id={post_id}", post_totals, post_budget)
+        print(f"  中位数: {_kb(median)}；超过中位数 {factor} 倍的文章标记为异常")
+
+    print()
+    if problems:
+        print("❌ 超出预算：")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    print("✅ 所有页面都在预算之内")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+站点构建脚本
+功能：
+1. 把第一页文章卡片直接渲染进index.html，内联首屏关键CSS，
+   并嵌入第一页索引数据供main.js直接使用，省去首屏的多次往返请求
+2. 计算每篇文章的上一篇/下一篇和同标签的相邻文章，写入文章JSON，
+   并生成预取提示，让浏览器在空闲时提前加载读者可能要看的下一篇
+3. 更新文章间的反向链接（"被提及于"，见link_graph.py）
+"""
+
+import re
+import json
+import html
+import hashlib
+import argparse
+from itertools import islice
+from pathlib import Path
+from urllib.parse import quote, unquote, urlsplit
+
+from build_cache import load_cache, save_cache, file_signature
+from index_store import iter_index, iter_index_reversed, count_entries
+
+# ========== 配置区域 ==========
+POSTS_DIR = Path("./posts")  # 存放文章JSON的文件夹
+INDEX_HTML = Path("./index.html")  # 首页
+STYLE_FILE = Path("./css/style.css")  # 主样式表
+PAGE_SIZE = 10  # 首页第一页显示的文章数
+
+# 首屏需要的选择器（选择器中的每一部分都在这里才会被内联）
+CRITICAL_SELECTORS = {
+    ':root', '*', 'html', 'body', '.container',
+    'header', 'h1', 'h2', '.subtitle',
+    '.search-container', '.search-box-wrapper', '.search-box',
+    '.search-icon', '.search-results',
+    '.intro', '.social-link', '.posts-container',
+    '.post-card', '.post-title', '.post-date', '.post-summary', '.read-more',
+    '.theme-switcher', '.reading-progress',
+    '.loading', '.error', '.no-posts',
+}
+
+
+# =============================
+
+def load_first_page(page_size=PAGE_SIZE):
+    """从索引末尾倒着读出第一页（最新的在前），不读取整个索引"""
+    return list(islice(iter_index_reversed(), page_size))
+
+
+def render_post_card(post):
+    """渲染单张文章卡片，结构与main.js中的renderPostCards保持一致"""
+    esc = html.escape
+    return (
+        f'<div class="post-card" onclick="window.location.href=\'post.html?id={esc(post["id"])}\'">'
+        f'<h3 class="post-title">{esc(post.get("title", ""))}</h3>'
+        f'<span class="post-date"><i class="far fa-calendar"></i> {esc(post.get("date", ""))}'
+        f' • <i class="far fa-clock"></i> {esc(post.get("readTime", ""))}</span>'
+        f'<p class="post-summary">{esc(post.get("summary", ""))}</p>'
+        f'<a class="read-more">阅读全文 <i class="fas fa-arrow-right"></i></a>'
+        f'</div>'
+    )
+
+
+def _strip_pseudo(part):
+    """去掉选择器片段上的伪类，:root这类单独的伪类保持原样"""
+    return re.sub(r'(?<=[\w\-\)\]*])::?[\w-]+(\([^)]*\))?', '', part)
+
+
+def _is_critical(selector_list):
+    """选择器列表中只要有一个选择器的所有部分都是首屏选择器，就算关键规则"""
+    for selector in selector_list.split(','):
+        parts = [_strip_pseudo(p) for p in re.split(r'[\s>+~]+', selector.strip()) if p]
+        if parts and all(p in CRITICAL_SELECTORS for p in parts):
+            return True
+    return False
+
+
+def _minify_block(block):
+    """压缩声明块里的空白"""
+    declarations = []
+    for decl in block.split(';'):
+        decl = re.sub(r'\s+', ' ', decl).strip()
+        if decl:
+            declarations.append(re.sub(r'\s*:\s*', ':', decl, count=1))
+    return ';'.join(declarations)
+
+
+def extract_critical_css(css_text):
+    """
+    从样式表中提取首屏需要的规则并压缩
+    （只做简单的花括号匹配，@media等嵌套规则会递归筛选）
+    """
+    css_text = re.sub(r'/\*.*?\*/', '', css_text, flags=re.DOTALL)
+    output = []
+    pos = 0
+    while True:
+        brace = css_text.find('{', pos)
+        if brace == -1:
+            break
+        prelude = css_text[pos:brace].strip()
+
+        # 找到与之匹配的右花括号
+        depth = 1
+        end = brace + 1
+        while end < len(css_text) and depth:
+            if css_text[end] == '{':
+                depth += 1
+            elif css_text[end] == '}':
+                depth -= 1
+            end += 1
+        inner = css_text[brace + 1:end - 1]
+        pos = end
+
+        prelude = re.sub(r'\s+', ' ', prelude)
+        if prelude.startswith('@'):
+            if prelude.startswith('@media') and 'print' not in prelude:
+                nested = extract_critical_css(inner)
+                if nested:
+                    output.append(f'{prelude}{{{nested}}}')
+        elif _is_critical(prelude):
+            selector = re.sub(r'\s*,\s*', ',', prelude)
+            output.append(f'{selector}{{{_minify_block(inner)}}}')
+    return ''.join(output)
+
+
+def first_page_data(page_size=PAGE_SIZE):
+    """嵌入页面的第一页索引数据"""
+    return {
+        "pageSize": page_size,
+        "total": count_entries(),
+        "posts": load_first_page(page_size),
+    }
+
+
+def post_url(post_id):
+    """文章JSON的地址（与main.js中的fetch地址一致）"""
+    return f"posts/{quote(post_id)}.json"
+
+
+def render_prefetch(posts):
+    """首页最可能被点开的是第一篇，让浏览器空闲时预取文章页和它的JSON"""
+    if not posts:
+        return '<!-- 没有可预取的文章 -->'
+    return '\n'.join([
+        '<link rel="prefetch" href="post.html">',
+        f'<link rel="prefetch" href="{post_url(posts[0]["id"])}" as="fetch" crossorigin>',
+    ])
+
+
+def _inline_json(data):
+    """序列化为可以安全放进<script>标签的JSON"""
+    text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+    return text.replace('<', '\\u003c').replace('>', '\\u003e').replace('&', '\\u0026')
+
+
+def page_hash(page_data, css_text):
+    """第一页数据和样式表共同决定首页的构建结果"""
+    digest = hashlib.sha1()
+    digest.update(json.dumps(page_data, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+    digest.update(css_text.encode('utf-8'))
+    return digest.hexdigest()[:12]
+
+
+def _replace_block(page, name, content):
+    """替换 <!-- BUILD:NAME --> 与 <!-- /BUILD:NAME --> 之间的内容"""
+    pattern = re.compile(
+        r'([ \t]*)(<!-- BUILD:%s -->)(\r?\n)(.*?)([ \t]*<!-- /BUILD:%s -->)' % (name, name),
+        re.DOTALL)
+    if not pattern.search(page):
+        raise ValueError(f"index.html中缺少构建标记 BUILD:{name}")
+
+    def fill(match):
+        # 插入的内容沿用标记行的缩进和换行符
+        indent, newline = match.group(1), match.group(3)
+        lines = newline.join(indent + line for line in content.split('\n'))
+        return f'{indent}{match.group(2)}{newline}{lines}{newline}{match.group(5)}'
+
+    return pattern.sub(fill, page, count=1)
+
+
+def current_page_hash(page):
+    """读取index.html中记录的构建哈希"""
+    match = re.search(r'id="posts-first-page" data-hash="([0-9a-f]+)"', page)
+    return match.group(1) if match else None
+
+
+def build_index_page(force=False):
+    """
+    预渲染首页。第一页内容和样式表都没有变化时不改写文件。
+    返回True表示index.html已更新
+    """
+    css_text = STYLE_FILE.read_text(encoding='utf-8') if STYLE_FILE.exists() else ''
+    with open(INDEX_HTML, 'r', encoding='utf-8', newline='') as f:
+        page = f.read()
+
+    page_data = first_page_data()
+    new_hash = page_hash(page_data, css_text)
+    if not force and current_page_hash(page) == new_hash:
+        return False
+
+    if page_data['posts']:
+        cards = '\n'.join(render_post_card(post) for post in page_data['posts'])
+    else:
+        cards = '<p class="no-posts">还没有日志，快去创建第一篇吧！</p>'
+
+    page = _replace_block(page, 'CRITICAL_CSS',
+                          f'<style id="critical-css">{extract_critical_css(css_text)}</style>')
+    page = _replace_block(page, 'PREFETCH', render_prefetch(page_data['posts']))
+    page = _replace_block(page, 'POSTS_LIST', cards)
+    page = _replace_block(page, 'POSTS_DATA',
+                          f'<script type="application/json" id="posts-first-page" '
+                          f'data-hash="{new_hash}">{_inline_json(page_data)}</script>')
+
+    with open(INDEX_HTML, 'w', encoding='utf-8', newline='') as f:
+        f.write(page)
+    return True
+
+
+def _nav_link(post):
+    return {"id": post['id'], "title": post.get('title', '')} if post else None
+
+
+def compute_neighbors():
+    """
+    按日期升序遍历索引，算出每篇文章的导航：
+    prev 为上一篇（更新的一篇），next 为下一篇（更早的一篇），与首页列表的顺序一致；
+    tags 中是每个标签下的上一篇/下一篇
+    """
+    navs = {}
+    older = None
+    older_by_tag = {}
+    for post in iter_index():
+        nav = {"prev": None, "next": _nav_link(older), "tags": {}}
+        if older is not None:
+            navs[older['id']]['prev'] = _nav_link(post)
+        for tag in post.get('tags', []):
+            tag_older = older_by_tag.get(tag)
+            nav['tags'][tag] = {"prev": None, "next": _nav_link(tag_older)}
+            if tag_older is not None:
+                navs[tag_older['id']]['tags'][tag]['prev'] = _nav_link(post)
+            older_by_tag[tag] = post
+        navs[post['id']] = nav
+        older = post
+
+    # 没有同标签相邻文章的标签不写入
+    for nav in navs.values():
+        nav['tags'] = {tag: link for tag, link in nav['tags'].items()
+                       if link['prev'] or link['next']}
+    return navs
+
+
+# 正文和页面中的<img>，分组3是src的值
+IMG_SRC_RE = re.compile(r'''(<img\b[^>]*?\bsrc\s*=\s*)(["'])(.*?)\2''', re.IGNORECASE | re.DOTALL)
+
+
+def is_external(url):
+    """带协议（http:、data: 等）或以 // 开头的地址不在仓库里"""
+    return bool(re.match(r'^([a-z][a-z0-9+.-]*:|//)', url, re.IGNORECASE))
+
+
+def local_path(url):
+    """
+    把页面或文章中引用的地址解析为仓库中的相对路径（如 images/a.jpg）：
+    去掉查询串和锚点、开头的 ./ ../ 和 /，并解码%编码。外部地址返回None
+    """
+    if is_external(url):
+        return None
+    path = re.sub(r'^(\.\.?/)+|^/', '', unquote(urlsplit(url).path))
+    return Path(path) if path else None
+
+
+def load_post(path):
+    """读取一篇文章的JSON"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_post(post, path):
+    """保存一篇文章的JSON"""
+    # 沿用文件原有的换行符，避免整份文件出现在diff里
+    newline = None
+    if path.exists():
+        with open(path, 'rb') as f:
+            newline = '\r\n' if b'\r\n' in f.read() else '\n'
+    with open(path, 'w', encoding='utf-8', newline=newline) as f:
+        json.dump(post, f, ensure_ascii=False, indent=2)
+
+
+def update_neighbors():
+    """
+    把导航写入文章JSON。只改写导航真正变化的文章
+    （新增一篇文章时通常只有它自己和前后相邻的几篇）。
+    缓存按文件签名记录：文章JSON被重写过（比如重新发布）时会重新检查。
+    返回被改写的文件列表
+    """
+    cached = load_cache('nav')
+    navs = compute_neighbors()
+    changed = []
+    entries = {}
+    for post_id, nav in navs.items():
+        path = POSTS_DIR / f"{post_id}.json"
+        if not path.exists():
+            print(f"警告：索引中的文章 {path} 不存在，跳过导航更新")
+            continue
+        signature = file_signature(path)
+        old = cached.get(post_id, {})
+        if old.get('nav') != nav or old.get('stat') != signature:
+            post = load_post(path)
+            if post.get('nav') != nav:
+                post['nav'] = nav
+                save_post(post, path)
+                changed.append(path)
+                signature = file_signature(path)
+        entries[post_id] = {'nav': nav, 'stat': signature}
+    save_cache('nav', entries)
+    return changed
+
+
+def rebuild_site():
+    """
+    发布后的增量构建：更新受影响文章的导航和反向链接，第一页变化时重新预渲染首页。
+    返回被改写的文件列表，供发布脚本提交
+    """
+    # link_graph依赖本模块，在这里导入以免循环导入
+    from link_graph import update_link_graph, print_problems
+
+    changed = update_neighbors()
+    link_changed, nodes = update_link_graph()
+    changed += [path for path in link_changed if path not in changed]
+    print_problems(nodes)
+    if build_index_page():
+        changed.append(INDEX_HTML)
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='构建站点：文章导航、反向链接、首页预渲染和关键CSS')
+    parser.add_argument('--force', '-f', action='store_true',
+                        help='即使第一页没有变化也重新构建首页')
+    args = parser.parse_args()
+
+    from link_graph import update_link_graph, print_problems
+
+    changed = update_neighbors()
+    print(f"✅ 已更新 {len(changed)} 篇文章的导航")
+    link_changed, nodes = update_link_graph()
+    print(f"✅ 已更新 {len(link_changed)} 篇文章的反向链接")
+    print_problems(nodes)
+
+    if build_index_page(force=args.force):
+        print(f"✅ 首页已重新构建: {INDEX_HTML}")
+    else:
+        print("✅ 第一页没有变化，无需重新构建")
+
+
+if __name__ == '__main__':
+    main()
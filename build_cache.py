@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+构建缓存
+保存上一次构建的中间结果（如文章导航），让增量构建只处理真正变化的部分。
+缓存只在本地使用，不提交到仓库；删掉缓存目录只会让下一次构建变慢。
+"""
+
+import os
+import json
+from pathlib import Path
+
+# ========== 配置区域 ==========
+CACHE_DIR = Path("./.build_cache")  # 缓存目录
+
+
+# =============================
+
+def load_cache(name):
+    """读取名为name的缓存，不存在或损坏时返回空字典"""
+    path = CACHE_DIR / f"{name}.json"
+    if not path.exists():
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        print(f"警告：缓存 {path} 无法读取，将重新构建")
+        return {}
+
+
+def save_cache(name, data):
+    """保存名为name的缓存"""
+    CACHE_DIR.mkdir(exist_ok=True)
+    path = CACHE_DIR / f"{name}.json"
+    tmp_path = path.with_suffix('.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+
+def file_signature(path):
+    """文件的 [修改时间, 大小]，用来判断缓存的结果是否还对应磁盘上的文件"""
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文章正文规范化
+把各种来源的正文（纯文本换行、<br>换行、Markdown转换结果、带内联样式的图片）
+统一成同一种HTML格式：段落都用<p>包裹，压缩多余空白，常见的内联样式换成CSS类。
+规范化后的正文带有 format 字段，浏览器端可以直接插入页面，不需要再做任何转换。
+
+直接运行本脚本会并行迁移 posts/ 中的所有文章，并报告节省的字节数。
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import argparse
+from html.parser import HTMLParser
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# ========== 配置区域 ==========
+POSTS_DIR = Path("./posts")
+BODY_FORMAT = 1  # 当前的正文格式版本
+
+# 内联样式声明 -> CSS类（定义在css/style.css中）
+STYLE_CLASSES = {
+    'max-width:100%': 'img-fluid',
+    'border-radius:8px': 'rounded',
+    'margin:1rem 0': 'spaced',
+}
+
+BLOCK_TAGS = {
+    'p', 'div', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'pre', 'ul', 'ol', 'li',
+    'blockquote', 'table', 'thead', 'tbody', 'tr', 'td', 'th', 'hr', 'figure',
+}
+VOID_TAGS = {'br', 'img', 'hr', 'input', 'meta', 'link', 'source', 'wbr'}
+PRESERVE_TAGS = {'pre', 'textarea', 'script', 'style'}  # 这些标签内部保留原样空白
+RAW_TEXT_TAGS = {'script', 'style'}  # 内容是原始文本，不能转义
+
+
+# =============================
+
+def style_to_classes(style):
+    """把内联样式拆成 (CSS类列表, 剩下的样式)"""
+    classes = []
+    remaining = []
+    for decl in style.split(';'):
+        decl = re.sub(r'\s*:\s*', ':', decl.strip().lower(), count=1)
+        decl = re.sub(r'\s+', ' ', decl)
+        if not decl:
+            continue
+        if decl in STYLE_CLASSES:
+            classes.append(STYLE_CLASSES[decl])
+        else:
+            remaining.append(decl)
+    return classes, ';'.join(remaining)
+
+
+def _splits_run(tag):
+    """块级标签和原样保留内容的标签会打断顶层的文本"""
+    return tag in BLOCK_TAGS or tag in PRESERVE_TAGS
+
+
+def _wrap_paragraphs(run):
+    """
+    把块级元素之间的一段文本和行内标签分成段落：空行（或连续的<br>）分段，
+    段内的单个换行转为<br>。行内标签没有闭合时不分段，只换行
+    """
+    paragraphs = [[]]
+    newlines = 0  # 上一个内容之后的换行数
+    inline_depth = 0
+
+    def add_content(token):
+        nonlocal newlines
+        if paragraphs[-1]:
+            if newlines >= 2 and not inline_depth:
+                paragraphs.append([])
+            elif newlines:
+                paragraphs[-1].append(('start', 'br', '<br>'))
+        newlines = 0
+        paragraphs[-1].append(token)
+
+    for kind, tag, text in run:
+        if kind == 'text':
+            for j, segment in enumerate(text.split('\n')):
+                if j:
+                    newlines += 1
+                if segment.strip():
+                    add_content(('text', None, re.sub(r'\s+', ' ', segment)))
+                elif segment and not newlines and paragraphs[-1]:
+                    paragraphs[-1].append(('text', None, ' '))  # 同一行中两个行内标签之间的空格
+        elif tag == 'br':
+            newlines += 1
+        elif kind == 'start':
+            add_content((kind, tag, text))
+            if tag not in VOID_TAGS:
+                inline_depth += 1
+        else:
+            paragraphs[-1].append((kind, tag, text))
+            inline_depth = max(inline_depth - 1, 0)
+
+    tokens = []
+    for paragraph in paragraphs:
+        if paragraph:
+            tokens += [('start', 'p', '<p>')] + paragraph + [('end', 'p', '</p>')]
+    return tokens
+
+
+class _Canonicalizer(HTMLParser):
+    """把HTML解析为标记序列，再按统一格式输出"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tokens = []  # (类型, 标签名或文本, 输出文本)
+        self.preserve_depth = 0
+        self.block_depth = 0  # 打开着的块级标签数，为0时处在顶层
+        self.loose = set()  # 处在顶层、不属于任何块级标签的标记的下标
+        self.raw_text = False  # 是否在<script>/<style>内部
+
+    def _format_attrs(self, tag, attrs):
+        attrs = dict(attrs)
+        if 'style' in attrs:
+            classes, style = style_to_classes(attrs.pop('style') or '')
+            if classes:
+                existing = (attrs.get('class') or '').split()
+                attrs['class'] = ' '.join(dict.fromkeys(existing + classes))
+            if style:
+                attrs['style'] = style
+        parts = []
+        for name, value in attrs.items():
+            if value is None:
+                parts.append(f' {name}')
+            else:
+                parts.append(f' {name}="{html.escape(value, quote=True)}"')
+        return ''.join(parts)
+
+    def _append(self, token):
+        if not self.block_depth and not _splits_run(token[1]):
+            self.loose.add(len(self.tokens))
+        self.tokens.append(token)
+
+    def handle_starttag(self, tag, attrs):
+        self._append(('start', tag, f'<{tag}{self._format_attrs(tag, attrs)}>'))
+        if _splits_run(tag) and tag not in VOID_TAGS:
+            self.block_depth += 1
+        if tag in PRESERVE_TAGS:
+            self.preserve_depth += 1
+        if tag in RAW_TEXT_TAGS:
+            self.raw_text = True
+
+    def handle_startendtag(self, tag, attrs):
+        self._append(('start', tag, f'<{tag}{self._format_attrs(tag, attrs)}>'))
+        if tag not in VOID_TAGS:
+            self._append(('end', tag, f'</{tag}>'))
+
+    def handle_endtag(self, tag):
+        if tag in VOID_TAGS:
+            return
+        if tag in PRESERVE_TAGS and self.preserve_depth:
+            self.preserve_depth -= 1
+        if tag in RAW_TEXT_TAGS:
+            self.raw_text = False
+        if _splits_run(tag) and self.block_depth:
+            self.block_depth -= 1
+        self._append(('end', tag, f'</{tag}>'))
+
+    def handle_data(self, data):
+        if self.raw_text:
+            # HTMLParser原样交出<script>/<style>的内容，也原样输出
+            self.tokens.append(('raw', None, data))
+        elif self.preserve_depth:
+            self.tokens.append(('raw', None, html.escape(data, quote=False)))
+        elif not self.block_depth:
+            self._append(('text', None, data))  # 顶层文本的换行决定分段，先原样保留
+        else:
+            self.tokens.append(('text', None, re.sub(r'\s+', ' ', data)))
+
+    def handle_comment(self, data):
+        pass  # 注释不输出
+
+    def _paragraphs(self):
+        """把顶层连续的文本和行内标签按纯文本的规则分段，其余标记不变"""
+        tokens = []
+        run = []
+        for i, token in enumerate(self.tokens):
+            if i in self.loose:
+                run.append(token)
+                continue
+            tokens += _wrap_paragraphs(run)
+            run = []
+            tokens.append(token)
+        return tokens + _wrap_paragraphs(run)
+
+    def result(self):
+        tokens = self._paragraphs()
+
+        def breaks(index):
+            # 块级标签和<br>两侧的空白没有意义
+            if index < 0 or index >= len(tokens):
+                return True
+            kind, tag, _ = tokens[index]
+            return kind in ('start', 'end') and (tag in BLOCK_TAGS or tag == 'br')
+
+        output = []
+        for i, (kind, tag, text) in enumerate(tokens):
+            if kind == 'text':
+                if breaks(i - 1):
+                    text = text.lstrip()
+                if breaks(i + 1):
+                    text = text.rstrip()
+                text = html.escape(text, quote=False)
+            output.append(text)
+        result = ''.join(output)
+        # 去掉空段落
+        return re.sub(r'<p>(\s|<br>)*</p>', '', result)
+
+
+def canonicalize_body(body):
+    """把正文转换为规范格式（对已经规范化的正文再执行一次结果不变）"""
+    body = body.replace('\r\n', '\n').replace('\r', '\n')
+    parser = _Canonicalizer()
+    parser.feed(body)
+    parser.close()
+    return parser.result()
+
+
+def canonicalize_post(post):
+    """规范化一篇文章的正文，返回是否有修改"""
+    if post.get('format') == BODY_FORMAT:
+        return False
+    post['body'] = canonicalize_body(post.get('body', ''))
+    post['format'] = BODY_FORMAT
+    return True
+
+
+def migrate_file(path, dry_run=False):
+    """迁移一篇文章，返回 (文件名, 是否修改, 迁移前字节数, 迁移后字节数)"""
+    from build import load_post, save_post
+
+    path = Path(path)
+    before = os.path.getsize(path)
+    post = load_post(path)
+    if not canonicalize_post(post):
+        return path.name, False, before, before
+    if dry_run:
+        with open(path, 'rb') as f:
+            newline = '\r\n' if b'\r\n' in f.read() else '\n'
+        text = json.dumps(post, ensure_ascii=False, indent=2).replace('\n', newline)
+        after = len(text.encode('utf-8'))
+    else:
+        save_post(post, path)
+        after = os.path.getsize(path)
+    return path.name, True, before, after
+
+
+def migrate_posts(posts_dir=POSTS_DIR, dry_run=False, workers=None):
+    """并行迁移目录中的所有文章，逐篇产出迁移结果"""
+    files = sorted(str(p) for p in Path(posts_dir).glob('*.json'))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(migrate_file, files, [dry_run] * len(files), chunksize=16)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把所有文章正文迁移为规范格式')
+    parser.add_argument('--dry-run', action='store_true', help='只统计，不写回文件')
+    parser.add_argument('--workers', '-j', type=int, help='并行进程数（默认为CPU核数）')
+    args = parser.parse_args()
+
+    if not POSTS_DIR.exists():
+        print(f"❌ 目录 {POSTS_DIR} 不存在")
+        sys.exit(1)
+
+    total_before = total_after = changed = 0
+    for name, migrated, before, after in migrate_posts(dry_run=args.dry_run, workers=args.workers):
+        total_before += before
+        total_after += after
+        if migrated:
+            changed += 1
+            print(f"  {name}: {before} -> {after} 字节")
+
+    saved = total_before - total_after
+    action = "可迁移" if args.dry_run else "已迁移"
+    result = f"共节省 {saved} 字节" if saved >= 0 else f"共增加 {-saved} 字节"
+    print(f"✅ {action} {changed} 篇文章，{result}（{total_before} -> {total_after}）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+博客离线归档导出
+功能：把所有文章按日期（最新在前）导出为一个zip包，或一个分页的单文件HTML。
+整个过程是生成器流水线：一次只处理一篇文章，内存占用不随文章数量增长；
+相同的图片只保存一份，所有文章都引用这一份。
+"""
+
+import os
+import re
+import sys
+import html
+import base64
+import hashlib
+import zipfile
+import argparse
+import datetime
+import tempfile
+import mimetypes
+from pathlib import Path
+
+from index_store import iter_index_reversed
+from build import STYLE_FILE, POSTS_DIR, IMG_SRC_RE, load_post, local_path
+from canonicalize import BODY_FORMAT
+
+# ========== 配置区域 ==========
+SITE_TITLE = "我的日常手记"
+PAGE_SIZE = 20  # 单文件HTML每页的文章数
+IMAGE_CHUNK = 57 * 1024  # 图片按块读取，3的倍数保证分块base64编码可以直接拼接
+
+# 已经压缩过的格式放进zip时不再压缩
+STORED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.zip'}
+
+
+# =============================
+
+def iter_posts():
+    """按日期倒序逐篇读取文章（最新在前）"""
+    for entry in iter_index_reversed():
+        path = POSTS_DIR / f"{entry['id']}.json"
+        if not path.exists():
+            print(f"警告：索引中的文章 {path} 不存在，跳过")
+            continue
+        yield load_post(path)
+
+
+def body_html(post):
+    """文章正文HTML（与main.js中loadSinglePost的处理一致）"""
+    if post.get('format', 0) >= BODY_FORMAT:
+        return post.get('body', '')
+    return post.get('body', '').replace('\n', '<br>')
+
+
+def _hash_file(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(IMAGE_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+class ImageStore:
+    """
+    本地图片去重：按内容哈希命名，同一张图片无论被多少篇文章引用、
+    以什么路径引用，都只保存一次
+    """
+
+    def __init__(self):
+        self.names = {}  # 本地路径 -> 归档中的名字
+        self.stored = set()  # 已经写入归档的名字
+
+    @staticmethod
+    def local_path(src):
+        """把文章中的图片地址解析为仓库里的文件，外部图片或文件不存在时返回None"""
+        path = local_path(src)
+        return path if path is not None and path.is_file() else None
+
+    def resolve(self, src):
+        """返回 (归档中的名字, 本地路径)，不是本地图片时返回 (None, None)"""
+        path = self.local_path(html.unescape(src))
+        if path is None:
+            return None, None
+        key = str(path)
+        if key not in self.names:
+            self.names[key] = f"{_hash_file(path)}{path.suffix.lower()}"
+        return self.names[key], path
+
+
+def with_images(posts, store):
+    """
+    流水线的一环：找出每篇文章引用的本地图片，
+    产出 (文章, 图片引用替换表, 本篇首次出现的图片列表)
+    """
+    for post in posts:
+        refs = {}
+        new_images = []
+        for match in IMG_SRC_RE.finditer(post.get('body', '')):
+            src = match.group(3)
+            name, path = store.resolve(src)
+            if name is None:
+                continue
+            refs[src] = name
+            if name not in store.stored:
+                store.stored.add(name)
+                new_images.append((name, path))
+        yield post, refs, new_images
+
+
+def _replace_images(body, refs, attribute):
+    """把正文中的本地图片引用替换为attribute(归档中的名字)生成的src属性值"""
+    def sub(match):
+        name = refs.get(match.group(3))
+        if name is None:
+            return match.group(0)
+        return match.group(1) + attribute(name)
+    return IMG_SRC_RE.sub(sub, body)
+
+
+def render_article(post, body):
+    """渲染一篇文章的HTML片段"""
+    esc = html.escape
+    tags = ''.join(f'<span class="tag">{esc(tag)}</span>' for tag in post.get('tags', []))
+    return (
+        f'<article class="archive-post" id="post-{esc(post["id"])}">'
+        f'<h1>{esc(post.get("title", ""))}</h1>'
+        f'<div class="post-meta"><span>{esc(post.get("date", ""))}</span> • '
+        f'<span>{esc(post.get("readTime", ""))}</span> • <span>{esc(post.get("mood", ""))}</span></div>'
+        f'<div class="post-tags">{tags}</div>'
+        f'<div class="post-body">{body}</div>'
+        f'</article>'
+    )
+
+
+def _page_head(title, css_href=None, inline_css=''):
+    link = f'<link rel="stylesheet" href="{css_href}">' if css_href else ''
+    return (
+        '<!DOCTYPE html>\n<html lang="zh-CN">\n<head>\n<meta charset="UTF-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+        f'<title>{html.escape(title)}</title>\n{link}'
+        f'<style>{inline_css}</style>\n</head>\n<body>\n<main class="container">\n'
+    )
+
+
+_PAGE_TAIL = '</main>\n</body>\n</html>\n'
+
+ARCHIVE_CSS = (
+    '.archive-post{background:var(--card-bg);padding:2.5rem;border-radius:10px;'
+    'box-shadow:var(--shadow);margin:2rem 0}'
+    '.archive-post .post-body img{max-width:100%;height:auto;display:block;margin:1.5rem 0}'
+    '.pager{display:flex;flex-wrap:wrap;gap:.5rem;justify-content:center;margin:2rem 0}'
+    '.pager a{color:var(--primary-color)}'
+)
+
+
+def _zip_member(name, date_time):
+    """流式写入的条目要自己建ZipInfo，否则时间戳是1980-01-01"""
+    info = zipfile.ZipInfo(name, date_time=date_time)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    info.external_attr = 0o644 << 16
+    return info
+
+
+def export_zip(output):
+    """
+    导出zip包：posts/<id>.html 每篇一页，images/ 中是去重后的图片，
+    index.html 是文章列表。所有条目都以流式写入
+    """
+    store = ImageStore()
+    count = 0
+    now = datetime.datetime.now().timetuple()[:6]
+    # 文章列表先写到临时文件，最后再流式拷进zip
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as zf, \
+            tempfile.TemporaryFile('w+', encoding='utf-8') as listing:
+        if STYLE_FILE.exists():
+            zf.write(STYLE_FILE, 'css/style.css')
+
+        for post, refs, new_images in with_images(iter_posts(), store):
+            for name, path in new_images:
+                compress = (zipfile.ZIP_STORED if path.suffix.lower() in STORED_EXTENSIONS
+                            else zipfile.ZIP_DEFLATED)
+                zf.write(path, f'images/{name}', compress_type=compress)
+
+            body = _replace_images(body_html(post), refs, lambda name: f'"../images/{name}"')
+            page = (_page_head(post.get('title', ''), '../css/style.css', ARCHIVE_CSS)
+                    + '<p><a href="../index.html">← 返回列表</a></p>'
+                    + render_article(post, body) + _PAGE_TAIL)
+            with zf.open(_zip_member(f"posts/{post['id']}.html", now), 'w') as f:
+                f.write(page.encode('utf-8'))
+
+            listing.write(
+                f'<li><a href="posts/{html.escape(post["id"])}.html">{html.escape(post.get("title", ""))}</a>'
+                f' <span class="post-date">{html.escape(post.get("date", ""))}</span></li>\n')
+            count += 1
+
+        listing.seek(0)
+        with zf.open(_zip_member('index.html', now), 'w') as f:
+            f.write((_page_head(SITE_TITLE, 'css/style.css', ARCHIVE_CSS)
+                     + f'<h1>{SITE_TITLE}</h1>\n<ul>\n').encode('utf-8'))
+            for line in listing:
+                f.write(line.encode('utf-8'))
+            f.write(('</ul>\n' + _PAGE_TAIL).encode('utf-8'))
+
+    return count, len(store.stored)
+
+
+def _write_image_data(out, name, path):
+    """把图片以base64写入一个不执行的script标签，分块编码，不把整张图读进内存"""
+    mime = mimetypes.guess_type(path.name)[0] or 'application/octet-stream'
+    out.write(f'<script type="text/plain" id="img-{name}">data:{mime};base64,')
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(IMAGE_CHUNK), b''):
+            out.write(base64.b64encode(chunk).decode('ascii'))
+    out.write('</script>\n')
+
+
+# 分页和图片还原脚本：没有JavaScript时所有页面依次显示，图片不显示
+_HTML_SCRIPT = '''<script>
+(function () {
+    document.querySelectorAll('img[data-img]').forEach(function (img) {
+        var data = document.getElementById('img-' + img.dataset.img);
+        if (data) img.src = data.textContent;
+    });
+    function showPage() {
+        var target = location.hash.replace('#', '') || 'page-1';
+        var post = document.getElementById(target);
+        var page = post && post.closest('.page');
+        if (!page) page = document.getElementById('page-1');
+        document.querySelectorAll('.page').forEach(function (p) {
+            p.style.display = p === page ? '' : 'none';
+        });
+        if (post && post !== page) post.scrollIntoView();
+    }
+    window.addEventListener('hashchange', showPage);
+    showPage();
+})();
+</script>
+'''
+
+
+def export_html(output, page_size=PAGE_SIZE):
+    """
+    导出单文件HTML：所有文章分页放在同一个文件里，
+    图片以base64只内嵌一次，各处通过data-img引用
+    """
+    store = ImageStore()
+    count = 0
+    page = 0
+    css = STYLE_FILE.read_text(encoding='utf-8') if STYLE_FILE.exists() else ''
+    with open(output, 'w', encoding='utf-8') as out:
+        out.write(_page_head(SITE_TITLE, inline_css=css + ARCHIVE_CSS))
+        out.write(f'<h1>{SITE_TITLE}</h1>\n')
+
+        for post, refs, new_images in with_images(iter_posts(), store):
+            if count % page_size == 0:
+                if page:
+                    out.write(f'<nav class="pager"><a href="#page-{page + 1}">下一页 →</a></nav></section>\n')
+                page += 1
+                out.write(f'<section class="page" id="page-{page}">\n')
+                if page > 1:
+                    out.write(f'<nav class="pager"><a href="#page-{page - 1}">← 上一页</a></nav>\n')
+
+            for name, path in new_images:
+                _write_image_data(out, name, path)
+
+            body = _replace_images(body_html(post), refs, lambda name: f'"" data-img="{name}"')
+            out.write(render_article(post, body) + '\n')
+            count += 1
+
+        if page:
+            out.write('</section>\n')
+        out.write('<nav class="pager">')
+        out.write(''.join(f'<a href="#page-{n}">{n}</a>' for n in range(1, page + 1)))
+        out.write('</nav>\n')
+        out.write(_HTML_SCRIPT)
+        out.write(_PAGE_TAIL)
+
+    return count, len(store.stored)
+
+
+def main():
+    today = datetime.date.today().strftime("%Y%m%d")
+    parser = argparse.ArgumentParser(description='导出博客离线归档')
+    parser.add_argument('format', choices=['zip', 'html'],
+                        help='zip: 每篇一页的zip包；html: 分页的单文件HTML')
+    parser.add_argument('--output', '-o', help='输出文件路径（默认 blog-archive-日期.zip/html）')
+    parser.add_argument('--page-size', type=int, default=PAGE_SIZE,
+                        help=f'单文件HTML每页的文章数（默认{PAGE_SIZE}）')
+    args = parser.parse_args()
+
+    output = Path(args.output or f"blog-archive-{today}.{args.format}")
+    print(f"📦 正在导出到 {output} ...")
+    try:
+        if args.format == 'zip':
+            count, images = export_zip(output)
+        else:
+            count, images = export_html(output, args.page_size)
+    except OSError as e:
+        print(f"❌ 导出失败: {e}")
+        sys.exit(1)
+
+    size = os.path.getsize(output)
+    print(f"✅ 导出完成：{count} 篇文章，{images} 张图片，{size / 1024:.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
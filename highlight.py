@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+构建时代码高亮
+用纯Python的表驱动词法分析器给代码块着色，输出带CSS类（tok-*）的<span>，
+颜色定义在css/style.css中。高亮在发布时只做一次，浏览器端不需要任何高亮脚本。
+同一段代码的高亮结果按内容哈希缓存在构建缓存中，重新构建时直接复用；
+缓存超过 MAX_CACHE_ENTRIES 条时丢弃最久没有用到的结果。
+"""
+
+import re
+import html
+import time
+import hashlib
+
+from build_cache import load_cache, save_cache
+
+# ========== 配置区域 ==========
+LEXER_VERSION = 1  # 修改词法规则后加一，让缓存失效
+MAX_CACHE_ENTRIES = 2000  # 高亮缓存的条数上限
+
+# 每种语言是一组按优先级排列的 (CSS类, 正则) 规则，同一位置先写的规则优先
+_STRINGS = [
+    ('str', r'"(?:\\.|[^"\\\n])*"'),
+    ('str', r"'(?:\\.|[^'\\\n])*'"),
+]
+_NUMBER = ('num', r'(?<![\w.])-?(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\b')
+
+LANGUAGE_RULES = {
+    'python': [
+        ('com', r'#[^\n]*'),
+        ('str', r'[rRbBuUfF]{0,2}"""[\s\S]*?"""'),
+        ('str', r"[rRbBuUfF]{0,2}'''[\s\S]*?'''"),
+        ('str', r'[rRbBuUfF]{0,2}"(?:\\.|[^"\\\n])*"'),
+        ('str', r"[rRbBuUfF]{0,2}'(?:\\.|[^'\\\n])*'"),
+        ('meta', r'@[\w.]+'),
+        ('fn', r'(?<=\bdef )\w+|(?<=\bclass )\w+'),
+        ('kw', r'\b(?:and|as|assert|async|await|break|class|continue|def|del|elif|else|except|'
+               r'finally|for|from|global|if|import|in|is|lambda|nonlocal|not|or|pass|raise|'
+               r'return|try|while|with|yield)\b'),
+        ('lit', r'\b(?:True|False|None)\b'),
+        ('bi', r'\b(?:print|len|range|open|str|int|float|bool|list|dict|set|tuple|isinstance|'
+               r'enumerate|zip|map|filter|sorted|super|self|cls)\b'),
+        _NUMBER,
+    ],
+    'javascript': [
+        ('com', r'//[^\n]*|/\*[\s\S]*?\*/'),
+        ('str', r'`(?:\\[\s\S]|[^`\\])*`'),
+        *_STRINGS,
+        ('kw', r'\b(?:async|await|break|case|catch|class|const|continue|default|delete|do|'
+               r'else|export|extends|finally|for|function|if|import|in|instanceof|let|new|'
+               r'of|return|static|super|switch|this|throw|try|typeof|var|void|while|yield)\b'),
+        ('lit', r'\b(?:true|false|null|undefined|NaN|Infinity)\b'),
+        ('fn', r'\b[A-Za-z_$][\w$]*(?=\s*\()'),
+        _NUMBER,
+    ],
+    'shell': [
+        ('com', r'(?<!\S)#[^\n]*'),
+        ('str', r'"(?:\\.|[^"\\])*"'),
+        ('str', r"'[^']*'"),
+        ('var', r'\$\{[^}\n]*\}|\$\w+|\$[@#?$!*-]'),
+        ('kw', r'\b(?:if|then|else|elif|fi|for|while|until|do|done|case|esac|function|in|'
+               r'return|export|local|source)\b'),
+        ('bi', r'(?<![\w-])(?:echo|cd|ls|cat|grep|git|python3?|pip3?|npm|node|sudo|mkdir|rm|'
+               r'cp|mv|curl|chmod|touch)(?![\w-])'),
+        ('attr', r'(?<!\S)--?[\w][\w-]*'),
+    ],
+    'json': [
+        ('prop', r'"(?:\\.|[^"\\\n])*"(?=\s*:)'),
+        ('str', r'"(?:\\.|[^"\\\n])*"'),
+        ('lit', r'\b(?:true|false|null)\b'),
+        _NUMBER,
+    ],
+    'html': [
+        ('com', r'<!--[\s\S]*?-->'),
+        ('meta', r'<![A-Za-z][^>]*>'),
+        ('tag', r'</?[A-Za-z][\w:-]*|/?>'),
+        ('attr', r'(?<=\s)[\w:@-]+(?=\s*=)'),
+        *_STRINGS,
+    ],
+    'css': [
+        ('com', r'/\*[\s\S]*?\*/'),
+        *_STRINGS,
+        ('kw', r'@[\w-]+|!important'),
+        ('sel', r'[^{};\s@][^{};]*?(?=\s*\{)'),
+        ('prop', r'(?<![\w-])-{0,2}[A-Za-z][\w-]*(?=\s*:)'),
+        ('num', r'#[0-9a-fA-F]{3,8}\b'),
+        ('num', r'(?<![\w-])-?\d*\.?\d+(?:%|[A-Za-z]+)?'),
+    ],
+}
+
+ALIASES = {
+    'py': 'python', 'python3': 'python',
+    'js': 'javascript', 'node': 'javascript',
+    'sh': 'shell', 'bash': 'shell', 'zsh': 'shell', 'console': 'shell', 'shell-session': 'shell',
+    'htm': 'html', 'xml': 'html', 'svg': 'html',
+}
+
+
+# =============================
+
+def _compile(rules):
+    """把一组规则合并成一个带命名分组的正则，分组名记录对应的CSS类"""
+    pattern = '|'.join(f'(?P<{cls}_{i}>{regex})' for i, (cls, regex) in enumerate(rules))
+    return re.compile(pattern)
+
+
+_LEXERS = {name: _compile(rules) for name, rules in LANGUAGE_RULES.items()}
+_cache = None  # 内容哈希 -> [高亮结果, 最后使用时间]，首次使用时从构建缓存读取
+_used = {}  # 本次构建用到的高亮结果，保存缓存时更新它们的使用时间
+
+
+def language_of(name):
+    """把代码块标注的语言名解析为支持的语言，不支持时返回None"""
+    name = (name or '').strip().lower()
+    name = ALIASES.get(name, name)
+    return name if name in _LEXERS else None
+
+
+def tokenize(code, language):
+    """逐个产出 (CSS类或None, 文本)"""
+    pos = 0
+    for match in _LEXERS[language].finditer(code):
+        if not match.group():
+            continue
+        if match.start() > pos:
+            yield None, code[pos:match.start()]
+        yield match.lastgroup.rsplit('_', 1)[0], match.group()
+        pos = match.end()
+    if pos < len(code):
+        yield None, code[pos:]
+
+
+def highlight(code, language):
+    """把代码高亮为HTML（不含外层的<pre><code>）"""
+    parts = []
+    for cls, text in tokenize(code, language):
+        text = html.escape(text, quote=False)
+        parts.append(f'<span class="tok-{cls}">{text}</span>' if cls else text)
+    return ''.join(parts)
+
+
+def _cache_key(code, language):
+    digest = hashlib.sha1(f"{LEXER_VERSION}\0{language}\0{code}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def highlight_block(code, language_name=None):
+    """
+    渲染一个完整的代码块。支持的语言会被高亮，结果按内容哈希缓存；
+    不支持的语言只做转义
+    """
+    global _cache
+    language = language_of(language_name)
+    if language is None:
+        return f'<pre><code>{html.escape(code, quote=False)}</code></pre>'
+
+    key = _cache_key(code, language)
+    body = _used.get(key)
+    if body is None:
+        if _cache is None:
+            _cache = load_cache('highlight')
+        entry = _cache.get(key)
+        body = entry[0] if isinstance(entry, list) else entry
+        if body is None:
+            body = highlight(code, language)
+        _used[key] = body
+    return f'<pre><code class="language-{language}">{body}</code></pre>'
+
+
+def take_highlight_results():
+    """
+    取出本进程到目前为止用到的高亮结果并清空。
+    进程池中的工作进程把它随转换结果一起返回，由主进程合并后保存
+    """
+    global _used
+    used, _used = _used, {}
+    return used
+
+
+def merge_highlight_results(used):
+    """合并工作进程返回的高亮结果"""
+    _used.update(used)
+
+
+def save_highlight_cache():
+    """
+    把本次构建用到的高亮结果合并进构建缓存并记下使用时间；
+    超过 MAX_CACHE_ENTRIES 条时丢弃最久没有用到的结果
+    """
+    global _cache
+    if not _used:
+        return
+    if _cache is None:
+        _cache = load_cache('highlight')
+    now = int(time.time())
+    for key, body in _used.items():
+        _cache[key] = [body, now]
+    _used.clear()
+    if len(_cache) > MAX_CACHE_ENTRIES:
+        # 旧版本缓存的值只有高亮结果，当作最久没用到
+        def last_used(item):
+            return item[1][1] if isinstance(item[1], list) else 0
+        _cache = dict(sorted(_cache.items(), key=last_used)[-MAX_CACHE_ENTRIES:])
+    save_cache('highlight', _cache)
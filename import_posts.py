@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+从其他博客系统批量导入文章
+支持：
+1. WordPress导出的WXR文件（XML）：用iterparse逐篇流式读取，处理完立即清除，
+   内存占用不随文件大小增长
+2. Hexo / Jekyll 的Markdown文章目录（带YAML Front Matter）
+
+转换在进程池中并行进行，已完成的文章记录在检查点文件中，中断后重新运行会跳过它们；
+全部转换完成后一次性写入索引。
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import hashlib
+import argparse
+import datetime
+import heapq
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from pathlib import Path
+from urllib.parse import unquote
+
+from blog_core import (parse_front_matter, slugify, parse_date, format_date_cn, save_post_file,
+                       POSTS_DIR, DEFAULT_MOOD, DEFAULT_TAGS, MAX_SLUG_LENGTH)
+from build import rebuild_site
+from build_cache import CACHE_DIR
+from canonicalize import BODY_FORMAT, BLOCK_TAGS, RAW_TEXT_TAGS, canonicalize_body
+from highlight import take_highlight_results, merge_highlight_results, save_highlight_cache
+from index_store import iter_index, write_index, date_key, normalize_entry, INDEX_FILE, INDEX_NDJSON
+from index_versions import publish_index
+
+# ========== 配置区域 ==========
+CHARS_PER_MINUTE = 400  # 估算阅读时长用的阅读速度
+SUMMARY_LENGTH = 100  # 没有摘要时从正文截取的字数
+MARKDOWN_SUFFIXES = {'.md', '.markdown'}
+
+# WXR中用到的命名空间
+WXR_NS = {
+    'content': 'http://purl.org/rss/1.0/modules/content/',
+    'excerpt': 'http://wordpress.org/export/1.2/excerpt/',
+    'wp': 'http://wordpress.org/export/1.2/',
+}
+
+
+# =============================
+
+# ---------- 读取来源（在主进程中流式进行） ----------
+
+def read_wordpress(path, include_drafts=False):
+    """逐篇产出WXR中的文章，每篇处理完就从树中清除"""
+    ns = dict(WXR_NS)
+
+    def text(item, tag):
+        prefix, _, name = tag.rpartition(':')
+        found = item.find(f'{{{ns[prefix]}}}{name}' if prefix else name)
+        return (found.text or '') if found is not None else ''
+
+    channel = None
+    for event, elem in ET.iterparse(path, events=('start-ns', 'start', 'end')):
+        if event == 'start-ns':
+            # WXR的版本号写在命名空间里（1.0/1.1/1.2），以文件中实际声明的为准
+            prefix, uri = elem
+            if prefix in ns:
+                ns[prefix] = uri
+            continue
+        if event == 'start':
+            if elem.tag == 'channel':
+                channel = elem
+            continue
+        if elem.tag != 'item':
+            continue
+
+        status = text(elem, 'wp:status')
+        if text(elem, 'wp:post_type') == 'post' and (status == 'publish' or include_drafts):
+            tags = []
+            for category in elem.findall('category'):
+                if category.get('domain') in ('post_tag', 'category') and category.text:
+                    tags.append(category.text.strip())
+            yield {
+                'key': f"wp:{text(elem, 'wp:post_id') or text(elem, 'guid')}",
+                'title': text(elem, 'title').strip(),
+                'date': text(elem, 'wp:post_date'),
+                'slug': unquote(text(elem, 'wp:post_name')),
+                'tags': list(dict.fromkeys(t for t in tags if t != 'Uncategorized')),
+                'summary': text(elem, 'excerpt:encoded').strip(),
+                'content': text(elem, 'content:encoded'),
+                'markup': 'html',
+            }
+
+        elem.clear()
+        if channel is not None:
+            channel.remove(elem)  # 已处理的item不留在树里
+
+
+def _flatten(value):
+    """categories 可能是嵌套列表（Hexo的多级分类）"""
+    if isinstance(value, list):
+        for v in value:
+            yield from _flatten(v)
+    elif value:
+        yield value
+
+
+def read_markdown_dir(directory, include_drafts=False):
+    """逐篇产出Hexo/Jekyll目录中的文章（递归查找.md/.markdown文件）"""
+    directory = Path(directory)
+    for path in sorted(directory.rglob('*')):
+        if path.suffix.lower() not in MARKDOWN_SUFFIXES or not path.is_file():
+            continue
+        if not include_drafts and '_drafts' in path.relative_to(directory).parts:
+            continue
+        metadata, body = parse_front_matter(path.read_text(encoding='utf-8'), required=False)
+        if not include_drafts and str(metadata.get('published', '')).lower() == 'false':
+            continue
+
+        # Jekyll的文件名自带日期：2024-05-22-slug.md
+        name_match = re.match(r'(\d{4}-\d{2}-\d{2})-(.+)$', path.stem)
+        date = str(metadata.get('date') or '') or (name_match.group(1) if name_match else '')
+        summary = metadata.get('excerpt') or metadata.get('description') or ''
+        if not summary and '<!-- more -->' in body:
+            summary = body.split('<!-- more -->', 1)[0]
+        tags = list(_flatten(metadata.get('tags', []))) + list(_flatten(metadata.get('categories', [])))
+        yield {
+            'key': f"md:{path.relative_to(directory).as_posix()}",
+            'title': str(metadata.get('title') or path.stem),
+            'date': date,
+            'slug': name_match.group(2) if name_match else path.stem,
+            'tags': list(dict.fromkeys(str(t) for t in tags)),
+            'summary': summary.strip() if isinstance(summary, str) else '',
+            'content': body.replace('<!-- more -->', ''),
+            'markup': 'markdown',
+        }
+
+
+# ---------- 转换（在工作进程中进行） ----------
+
+def _autop(content):
+    """WordPress正文用空行分段、不写<p>，这里补上段落标签"""
+    if re.search(r'<p\b', content, re.IGNORECASE):
+        return content
+    block_start = re.compile(r'<(%s)\b' % '|'.join(BLOCK_TAGS | RAW_TEXT_TAGS), re.IGNORECASE)
+    paragraphs = []
+    for para in re.split(r'\n\s*\n', content.replace('\r\n', '\n')):
+        para = para.strip()
+        if not para:
+            continue
+        if block_start.match(para):
+            paragraphs.append(para)
+        else:
+            paragraphs.append('<p>' + para.replace('\n', '<br>') + '</p>')
+    return ''.join(paragraphs)
+
+
+def _plain_text(body):
+    """正文HTML中读者能看到的文字（<script>/<style>的内容不算）"""
+    body = re.sub(r'<(script|style)\b.*?</\1\s*>', ' ', body, flags=re.IGNORECASE | re.DOTALL)
+    return html.unescape(re.sub(r'\s+', ' ', re.sub(r'<[^>]+>', ' ', body))).strip()
+
+
+def convert_post(raw):
+    """
+    把一篇来源文章转换为本博客的文章格式（不含最终ID），
+    同时返回转换中用到的代码高亮结果，由主进程写回缓存
+    """
+    if raw['markup'] == 'markdown':
+        from publish import markdown_to_html
+        to_html = markdown_to_html
+    else:
+        to_html = _autop
+    body = canonicalize_body(to_html(raw['content'].strip()))
+
+    text = _plain_text(body)
+    # 摘要（如Hexo的 <!-- more --> 之前的部分）和正文一样先转换成HTML，再取文字
+    summary = _plain_text(to_html(raw['summary'].strip())) if raw['summary'] else text[:SUMMARY_LENGTH]
+    date = parse_date(raw['date']) or datetime.date.today()
+    slug = slugify(raw['slug']) or slugify(raw['title'])
+    if not slug or len(slug) > MAX_SLUG_LENGTH:
+        slug = hashlib.sha1(raw['key'].encode('utf-8')).hexdigest()[:8]
+
+    return raw['key'], f"{date.isoformat()}-{slug}", {
+        "title": raw['title'],
+        "date": format_date_cn(date),
+        "readTime": f"{max(1, round(len(text) / CHARS_PER_MINUTE))}分钟阅读",
+        "mood": DEFAULT_MOOD,
+        "tags": raw['tags'] or list(DEFAULT_TAGS),
+        "summary": summary,
+        "body": body,
+        "format": BODY_FORMAT,
+    }, take_highlight_results()
+
+
+# ---------- 检查点与写入（在主进程中进行） ----------
+
+def checkpoint_path(source):
+    """每个来源一个检查点文件，放在构建缓存目录中"""
+    digest = hashlib.sha1(str(Path(source).resolve()).encode('utf-8')).hexdigest()[:12]
+    return CACHE_DIR / f"import-{digest}.ndjson"
+
+
+def load_checkpoint(path):
+    """读取已完成的文章，返回 {来源key: 索引条目}"""
+    done = {}
+    if path.exists():
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # 中断时写了一半的最后一行
+                done[record['key']] = record['entry']
+    return done
+
+
+def _unique_id(post_id, taken):
+    candidate, n = post_id, 2
+    while candidate in taken:
+        candidate = f"{post_id}-{n}"
+        n += 1
+    taken.add(candidate)
+    return candidate
+
+
+def run_import(items, checkpoint, workers=None):
+    """
+    并行转换，每完成一篇就写出文章JSON并追加到检查点。
+    同时在途的任务数有上限，来源读取不会跑到转换前面太多。
+    返回本次新导入的篇数和失败的篇数
+    """
+    done = load_checkpoint(checkpoint)
+    taken = {entry['id'] for entry in iter_index()} | {entry['id'] for entry in done.values()}
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 4
+    imported = failed = 0
+
+    checkpoint.parent.mkdir(exist_ok=True)
+    POSTS_DIR.mkdir(exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(checkpoint, 'a', encoding='utf-8') as log:
+
+        pending = {}  # future -> 来源key
+
+        def collect(futures):
+            nonlocal imported, failed
+            for future in futures:
+                try:
+                    key, post_id, post, highlights = future.result()
+                except Exception as e:
+                    failed += 1
+                    print(f"⚠️  转换失败（下次运行会重试）: {pending[future]}: {e}")
+                    continue
+                merge_highlight_results(highlights)
+                post = {"id": _unique_id(post_id, taken), **post}
+                save_post_file(post)
+                log.write(json.dumps({'key': key, 'entry': normalize_entry(post)},
+                                     ensure_ascii=False) + '\n')
+                log.flush()
+                imported += 1
+                print(f"  📄 {post['id']}")
+
+        for raw in items:
+            if raw['key'] in done:
+                continue
+            if len(pending) >= max_pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+                for future in finished:
+                    del pending[future]
+            pending[pool.submit(convert_post, raw)] = raw['key']
+        collect(list(pending))
+
+    save_highlight_cache()
+    return imported, failed
+
+
+def commit_index(checkpoint):
+    """把检查点中的所有文章一次性合并进索引（同ID的条目以导入的为准）"""
+    entries = sorted(load_checkpoint(checkpoint).values(), key=date_key)
+    new_ids = {entry['id'] for entry in entries}
+    existing = (entry for entry in iter_index() if entry['id'] not in new_ids)
+    write_index(heapq.merge(existing, entries, key=date_key))
+    publish_index()
+    return len(entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从WordPress或Hexo/Jekyll批量导入文章')
+    parser.add_argument('source', choices=['wordpress', 'markdown'],
+                        help='wordpress: WXR导出文件；markdown: Hexo/Jekyll文章目录')
+    parser.add_argument('path', help='WXR文件或Markdown目录的路径')
+    parser.add_argument('--workers', '-j', type=int, help='并行进程数（默认为CPU核数）')
+    parser.add_argument('--drafts', action='store_true', help='同时导入草稿')
+    parser.add_argument('--checkpoint', help='检查点文件（默认按来源路径放在构建缓存目录中）')
+    args = parser.parse_args()
+
+    source = Path(args.path)
+    if not source.exists():
+        print(f"❌ {source} 不存在")
+        sys.exit(1)
+
+    if args.source == 'wordpress':
+        items = read_wordpress(source, args.drafts)
+    else:
+        items = read_markdown_dir(source, args.drafts)
+    checkpoint = Path(args.checkpoint) if args.checkpoint else checkpoint_path(source)
+
+    print(f"📥 正在导入 {source} ...")
+    try:
+        imported, failed = run_import(items, checkpoint, args.workers)
+    except (OSError, ET.ParseError) as e:
+        print(f"❌ 导入中断: {e}")
+        print("已转换的文章记录在检查点中，重新运行同一命令即可继续")
+        sys.exit(1)
+
+    total = commit_index(checkpoint)
+    print(f"📚 文章索引已更新: {INDEX_NDJSON} -> {INDEX_FILE}")
+    for path in rebuild_site():
+        print(f"🏠 已重新构建: {path}")
+
+    print(f"✅ 本次导入 {imported} 篇，该来源累计 {total} 篇" + (f"，{failed} 篇失败" if failed else ""))
+    print(f"检查点: {checkpoint}（删除后可重新完整导入）")
+
+
+if __name__ == '__main__':
+    main()
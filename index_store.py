@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文章索引存储
+posts_index.ndjson 是索引的唯一数据源：每行一篇文章，键顺序固定，按日期升序排列。
+新增或替换一篇文章只会改动一行，git diff和打包都很小；
+读写都是逐行流式进行，不会把整个文件读进内存。
+网站使用的 posts_index.json（最新在前的JSON数组）由它导出。
+"""
+
+import os
+import re
+import json
+import argparse
+import tempfile
+from pathlib import Path
+
+# ========== 配置区域 ==========
+INDEX_NDJSON = Path("./posts_index.ndjson")  # 索引数据源（每行一篇）
+INDEX_FILE = Path("./posts_index.json")  # 导出给网站使用的索引
+
+# 固定的键顺序，其他键按字母顺序排在后面
+KEY_ORDER = ('id', 'title', 'date', 'readTime', 'mood', 'tags', 'summary', 'keywords')
+# 只属于文章详情、不进入索引的键
+POST_ONLY_KEYS = {'body', 'format', 'nav', 'backlinks'}
+
+
+# =============================
+
+def date_key(post):
+    """
+    文章排序键：优先解析"2024年5月22日"格式的日期，
+    解析失败时退回到ID开头的YYYY-MM-DD
+    """
+    match = re.match(r'\s*(\d{4})年(\d{1,2})月(\d{1,2})日', post.get('date', ''))
+    if not match:
+        match = re.match(r'(\d{4})-(\d{2})-(\d{2})', post.get('id', ''))
+    if not match:
+        return (0, 0, 0, post.get('id', ''))
+    year, month, day = (int(x) for x in match.groups())
+    return (year, month, day, post.get('id', ''))
+
+
+def normalize_entry(entry):
+    """按固定顺序排列索引条目的键（不包含正文等文章详情）"""
+    ordered = {key: entry[key] for key in KEY_ORDER if key in entry}
+    for key in sorted(entry):
+        if key not in ordered and key not in POST_ONLY_KEYS:
+            ordered[key] = entry[key]
+    return ordered
+
+
+def dump_line(entry):
+    """把一个索引条目序列化为一行"""
+    return json.dumps(normalize_entry(entry), ensure_ascii=False, separators=(',', ':')) + '\n'
+
+
+def _id_prefix(post_id):
+    """每行都以id开头，用前缀就能判断是哪篇文章，不必解析整行"""
+    return '{"id":' + json.dumps(post_id, ensure_ascii=False) + ','
+
+
+def iter_index(path=INDEX_NDJSON):
+    """按日期升序逐行读取索引"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_index_reversed(path=INDEX_NDJSON, block_size=64 * 1024):
+    """从文件末尾按块往回读，按日期倒序（最新的在前）逐行产出"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b''
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            lines = (f.read(step) + remainder).split(b'\n')
+            # 第一段可能是半行，留到下一块再处理
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield json.loads(line.decode('utf-8'))
+        if remainder.strip():
+            yield json.loads(remainder.decode('utf-8'))
+
+
+def count_entries(path=INDEX_NDJSON):
+    """统计索引中的文章数"""
+    if not os.path.exists(path):
+        return 0
+    with open(path, 'r', encoding='utf-8') as f:
+        return sum(1 for line in f if line.strip())
+
+
+def _last_line(path):
+    """读取最后一行（文件为空时返回None）"""
+    for entry in iter_index_reversed(path, block_size=4096):
+        return entry
+    return None
+
+
+def _atomic_write(path, lines):
+    """写到同目录的临时文件，再整体替换，避免写一半的索引"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+            for line in lines:
+                f.write(line)
+        # mkstemp建的文件只有本人可读写，沿用原文件的权限（新文件用0644），网站才能读到
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_index(entries, path=INDEX_NDJSON):
+    """流式写入整个索引，entries需要已按日期升序排列"""
+    _atomic_write(path, (dump_line(entry) for entry in entries))
+
+
+def _contains(path, post_id):
+    prefix = _id_prefix(post_id)
+    with open(path, 'r', encoding='utf-8') as f:
+        return any(line.startswith(prefix) for line in f)
+
+
+def upsert_entry(entry, path=INDEX_NDJSON):
+    """
+    新增或替换一篇文章的索引条目。
+    新文章日期不早于最后一篇时直接追加一行；否则流式重写，把它放到日期对应的位置
+    """
+    new_line = dump_line(entry)
+    new_key = date_key(entry)
+
+    if not os.path.exists(path):
+        _atomic_write(path, [new_line])
+        return
+
+    last = _last_line(path)
+    if last is None or (new_key >= date_key(last) and not _contains(path, entry['id'])):
+        needs_newline = False
+        if os.path.getsize(path):
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                needs_newline = f.read(1) != b'\n'  # 手动编辑后可能没有结尾的换行
+        with open(path, 'a', encoding='utf-8', newline='\n') as f:
+            if needs_newline:
+                f.write('\n')
+            f.write(new_line)
+        return
+
+    def merged_lines():
+        prefix = _id_prefix(entry['id'])
+        inserted = False
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip() or line.startswith(prefix):
+                    continue
+                if not inserted and date_key(json.loads(line)) > new_key:
+                    yield new_line
+                    inserted = True
+                yield line if line.endswith('\n') else line + '\n'
+        if not inserted:
+            yield new_line
+
+    _atomic_write(path, merged_lines())
+
+
+def remove_entry(post_id, path=INDEX_NDJSON):
+    """从索引中删除一篇文章，返回是否找到"""
+    if not os.path.exists(path) or not _contains(path, post_id):
+        return False
+    prefix = _id_prefix(post_id)
+
+    def kept_lines():
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip() and not line.startswith(prefix):
+                    yield line
+
+    _atomic_write(path, kept_lines())
+    return True
+
+
+def export_json(path=INDEX_NDJSON, json_path=INDEX_FILE):
+    """
+    导出网站使用的 posts_index.json（最新在前的JSON数组），
+    格式与 json.dump(..., indent=2) 相同，但逐条写出
+    """
+    def json_lines():
+        yield '['
+        first = True
+        for entry in iter_index_reversed(path):
+            text = json.dumps(entry, ensure_ascii=False, indent=2)
+            yield ('\n' if first else ',\n') + '\n'.join('  ' + line for line in text.split('\n'))
+            first = False
+        yield '\n]' if not first else ']'
+
+    _atomic_write(json_path, json_lines())
+
+
+def import_json(json_path=INDEX_FILE, path=INDEX_NDJSON):
+    """一次性迁移：从旧的 posts_index.json 生成 posts_index.ndjson"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        index_data = json.load(f)
+    write_index(sorted(index_data, key=date_key), path)
+    return len(index_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='文章索引（NDJSON）管理')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('import', help=f'从 {INDEX_FILE} 生成 {INDEX_NDJSON}')
+    subparsers.add_parser('export', help=f'从 {INDEX_NDJSON} 导出 {INDEX_FILE}')
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        count = import_json()
+        print(f"✅ 已导入 {count} 篇文章到 {INDEX_NDJSON}")
+    elif args.command == 'export':
+        export_json()
+        print(f"✅ 已导出 {count_entries()} 篇文章到 {INDEX_FILE}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+索引版本与增量文件
+每次发布导出 posts_index.json 时，索引版本号加一，并为最近的 KEEP_VERSIONS 个版本
+生成累积增量 index/delta-<旧版本>-<新版本>.json：老访客只需下载自己缓存的版本之后的变化，
+一个请求就能更新到最新。更早的版本不再保留增量，直接合并进完整索引（posts_index.json），
+缓存太旧的访客重新下载完整索引。
+
+index/manifest.json 记录当前版本和最早可增量更新的版本，
+index/history.ndjson 记录每个版本改动了哪些文章。
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+import tempfile
+from pathlib import Path
+
+from index_store import (iter_index, upsert_entry, remove_entry, export_json, _atomic_write,
+                         INDEX_FILE, INDEX_NDJSON)
+
+# ========== 配置区域 ==========
+INDEX_DIR = Path("./index")
+MANIFEST_FILE = INDEX_DIR / "manifest.json"
+HISTORY_FILE = INDEX_DIR / "history.ndjson"
+KEEP_VERSIONS = 10  # 保留增量的版本数，更早的合并进完整索引
+
+
+# =============================
+
+def delta_path(from_version, to_version):
+    return INDEX_DIR / f"delta-{from_version}-{to_version}.json"
+
+
+def load_manifest():
+    """读取清单，不存在或损坏时返回None"""
+    try:
+        with open(MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def read_history():
+    """按版本升序读取每个版本改动的文章ID"""
+    if not HISTORY_FILE.exists():
+        return []
+    with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _write_json(path, data):
+    _atomic_write(path, [json.dumps(data, ensure_ascii=False, separators=(',', ':')) + '\n'])
+
+
+def changed_ids(json_path=INDEX_FILE, path=INDEX_NDJSON):
+    """
+    对比上一次导出的 posts_index.json（即上一个版本）和当前的NDJSON，
+    返回新增、修改或删除了的文章ID
+    """
+    previous = {}
+    if os.path.exists(json_path):
+        with open(json_path, 'r', encoding='utf-8') as f:
+            previous = {entry['id']: entry for entry in json.load(f)}
+    changed = set()
+    for entry in iter_index(path):
+        if previous.pop(entry['id'], None) != entry:
+            changed.add(entry['id'])
+    changed.update(previous)  # 剩下的是被删除的文章
+    return changed
+
+
+def build_deltas(history, version):
+    """
+    为history中最早版本的前一版到当前版本的前一版各生成一个累积增量，产出 (起始版本, 增量)。
+    每个增量包含之后所有版本改动过的文章：现在还在的放在upsert，已删除的放在remove
+    """
+    wanted = set()
+    for record in history:
+        wanted.update(record['ids'])
+    current = {entry['id']: entry for entry in iter_index() if entry['id'] in wanted}
+
+    ids = set()
+    for record in reversed(history):
+        ids.update(record['ids'])
+        from_version = record['version'] - 1
+        yield from_version, {
+            'from': from_version,
+            'to': version,
+            'upsert': [current[i] for i in sorted(ids) if i in current],
+            'remove': sorted(i for i in ids if i not in current),
+        }
+
+
+def publish_index():
+    """
+    导出 posts_index.json，有变化时生成新版本的清单和增量文件。
+    返回需要提交的文件列表（包括被删除的旧增量文件）
+    """
+    manifest = load_manifest()
+    changed = changed_ids()
+    export_json()
+    if manifest is not None and not changed:
+        return [INDEX_FILE]
+
+    INDEX_DIR.mkdir(exist_ok=True)
+    version = manifest['version'] + 1 if manifest else 1
+    history = [record for record in read_history() if record['version'] > version - KEEP_VERSIONS]
+    if manifest is not None:
+        # 第一个版本之前没有访客缓存过，不需要记录
+        history.append({'version': version, 'ids': sorted(changed)})
+    _atomic_write(HISTORY_FILE, (json.dumps(record, ensure_ascii=False) + '\n' for record in history))
+
+    files = [INDEX_FILE, HISTORY_FILE]
+    written = set()
+    for from_version, delta in build_deltas(history, version):
+        path = delta_path(from_version, version)
+        _write_json(path, delta)
+        written.add(path)
+        files.append(path)
+    # 旧版本的增量都指向旧的目标版本，已经没用了
+    for path in INDEX_DIR.glob('delta-*.json'):
+        if path not in written:
+            path.unlink()
+            files.append(path)
+
+    min_delta = history[0]['version'] - 1 if history else version
+    _write_json(MANIFEST_FILE, {'version': version, 'minDelta': min_delta, 'full': INDEX_FILE.name})
+    files.append(MANIFEST_FILE)
+    return files
+
+
+def client_update(cached):
+    """
+    模拟main.js中的loadPostsIndex：cached为 (版本, 文章列表) 或None，
+    返回 (更新后的文章列表, 下载的字节数, 请求的文件列表)
+    """
+    manifest = load_manifest()
+    fetched = [MANIFEST_FILE]
+    if cached is not None:
+        version, posts = cached
+        if version == manifest['version']:
+            return posts, os.path.getsize(MANIFEST_FILE), fetched
+        if manifest['minDelta'] <= version < manifest['version']:
+            path = delta_path(version, manifest['version'])
+            with open(path, 'r', encoding='utf-8') as f:
+                delta = json.load(f)
+            by_id = {post['id']: post for post in posts}
+            for post_id in delta['remove']:
+                by_id.pop(post_id, None)
+            for post in delta['upsert']:
+                by_id[post['id']] = post
+            fetched.append(path)
+            return list(by_id.values()), sum(os.path.getsize(p) for p in fetched), fetched
+    with open(INDEX_FILE, 'r', encoding='utf-8') as f:
+        posts = json.load(f)
+    fetched.append(INDEX_FILE)
+    return posts, sum(os.path.getsize(p) for p in fetched), fetched
+
+
+def _random_entry(rng, post_id=None):
+    year, month, day = rng.randint(2020, 2026), rng.randint(1, 12), rng.randint(1, 28)
+    post_id = post_id or f"{year}-{month:02d}-{day:02d}-post-{rng.randrange(10 ** 8)}"
+    return {
+        'id': post_id,
+        'title': f"文章 {rng.randrange(10 ** 6)}",
+        'date': f"{post_id[:4]}年{int(post_id[5:7])}月{int(post_id[8:10])}日",
+        'readTime': f"{rng.randint(1, 15)}分钟阅读",
+        'mood': rng.choice(['开心', '平静', '思考']),
+        'tags': rng.sample(['生活', '随笔', '代码', '旅行', '读书'], rng.randint(1, 3)),
+        'summary': '摘要' * rng.randint(5, 40),
+    }
+
+
+def simulate(versions=60, initial=200, seed=1):
+    """
+    在临时目录中随机发布versions个版本（新增、修改、删除文章），
+    再让缓存了每一个历史版本的访客各更新一次，检查结果都与最新索引一致。
+    返回失败的访客数
+    """
+    rng = random.Random(seed)
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for _ in range(initial):
+                upsert_entry(_random_entry(rng))
+            publish_index()
+            snapshots = {load_manifest()['version']: list(iter_index())}
+
+            for _ in range(versions):
+                ids = [entry['id'] for entry in iter_index()]
+                for _ in range(rng.randint(1, 3)):
+                    action = rng.random()
+                    if action < 0.5 or not ids:
+                        upsert_entry(_random_entry(rng))
+                    elif action < 0.85:
+                        upsert_entry(_random_entry(rng, rng.choice(ids)))
+                    else:
+                        remove_entry(ids.pop(rng.randrange(len(ids))))
+                publish_index()
+                snapshots[load_manifest()['version']] = list(iter_index())
+
+            manifest = load_manifest()
+            expected = sorted(json.dumps(e, sort_keys=True, ensure_ascii=False) for e in iter_index())
+            full_size = os.path.getsize(INDEX_FILE)
+            failures = 0
+            print(f"当前版本 {manifest['version']}，可增量更新的最早版本 {manifest['minDelta']}，"
+                  f"完整索引 {full_size} 字节")
+            for version, posts in [(None, None)] + sorted(snapshots.items()):
+                cached = None if version is None else (version, posts)
+                result, size, fetched = client_update(cached)
+                got = sorted(json.dumps(e, sort_keys=True, ensure_ascii=False) for e in result)
+                ok = got == expected
+                failures += not ok
+                label = '无缓存' if version is None else f"v{version}"
+                via = ' + '.join(Path(p).name for p in fetched)
+                print(f"  {'✅' if ok else '❌'} {label:<6} 下载 {size:>7} 字节 ({size * 100 // full_size:>3}%)  {via}")
+            return failures
+        finally:
+            os.chdir(cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='索引版本与增量文件')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('publish', help=f'导出 {INDEX_FILE} 并生成新版本的增量文件')
+    sim = subparsers.add_parser('simulate', help='模拟缓存了各个历史版本的访客，检查增量更新是否正确')
+    sim.add_argument('--versions', type=int, default=60, help='模拟发布的版本数')
+    sim.add_argument('--posts', type=int, default=200, help='初始文章数')
+    sim.add_argument('--seed', type=int, default=1, help='随机种子')
+    args = parser.parse_args()
+
+    if args.command == 'publish':
+        files = publish_index()
+        manifest = load_manifest()
+        print(f"✅ 索引版本 {manifest['version']}，更新了 {len(files)} 个文件")
+    elif args.command == 'simulate':
+        failures = simulate(args.versions, args.posts, args.seed)
+        if failures:
+            print(f"❌ {failures} 个访客更新后的索引与最新版本不一致")
+            sys.exit(1)
+        print("✅ 所有访客都更新到了最新版本")
+
+
+if __name__ == '__main__':
+    main()
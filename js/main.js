@@ -5,20 +5,164 @@ document.getElementById('current-year') && (document.getElementById('current-yea
 // 日志数据所在的文件夹路径
 const POSTS_INDEX_URL = 'posts_index.json';
 const POSTS_DIR = 'posts/';
+// 索引版本清单和本地缓存（见index_versions.py）
+const INDEX_MANIFEST_URL = 'index/manifest.json';
+const INDEX_CACHE_KEY = 'postsIndexCache';
+
+// 日期排序键：解析"2024年5月22日"，失败时退回到ID开头的YYYY-MM-DD（与build.py一致）
+function postDateKey(post) {
+    const match = /^\s*(\d{4})年(\d{1,2})月(\d{1,2})日/.exec(post.date || '')
+        || /^(\d{4})-(\d{2})-(\d{2})/.exec(post.id || '');
+    if (!match) return 0;
+    return Number(match[1]) * 10000 + Number(match[2]) * 100 + Number(match[3]);
+}
+
+// 按日期倒序排列，最新的在前；同一天的按ID倒序
+function sortPostsIndex(postsIndex) {
+    return postsIndex.sort((a, b) => (postDateKey(b) - postDateKey(a)) || (b.id < a.id ? -1 : b.id > a.id ? 1 : 0));
+}
+
+// 把增量应用到缓存的索引上：先删除，再新增或替换
+function applyIndexDelta(posts, delta) {
+    const byId = new Map(posts.map(post => [post.id, post]));
+    delta.remove.forEach(id => byId.delete(id));
+    delta.upsert.forEach(post => byId.set(post.id, post));
+    return Array.from(byId.values());
+}
+
+function readIndexCache() {
+    try {
+        return JSON.parse(localStorage.getItem(INDEX_CACHE_KEY));
+    } catch (error) {
+        return null;
+    }
+}
+
+function writeIndexCache(version, posts) {
+    try {
+        localStorage.setItem(INDEX_CACHE_KEY, JSON.stringify({ version, posts }));
+    } catch (error) {
+        console.warn('⚠️ [Main.js] 无法缓存索引:', error);
+    }
+}
+
+async function fetchPostsIndex() {
+    const cached = readIndexCache();
+    let manifest = null;
+    try {
+        const manifestResp = await fetch(INDEX_MANIFEST_URL, { cache: 'no-cache' });
+        if (manifestResp.ok) manifest = await manifestResp.json();
+    } catch (error) {
+        console.warn('⚠️ [Main.js] 无法获取索引版本:', error);
+    }
+
+    if (manifest && cached && Array.isArray(cached.posts)) {
+        // 缓存已是最新版本，不需要任何下载
+        if (cached.version === manifest.version) return cached.posts;
+        // 缓存的版本还有增量文件，只下载之后的变化
+        if (cached.version >= manifest.minDelta && cached.version < manifest.version) {
+            try {
+                const deltaResp = await fetch(`index/delta-${cached.version}-${manifest.version}.json`);
+                if (deltaResp.ok) {
+                    const posts = applyIndexDelta(cached.posts, await deltaResp.json());
+                    writeIndexCache(manifest.version, posts);
+                    return posts;
+                }
+            } catch (error) {
+                console.warn('⚠️ [Main.js] 增量更新失败，改为下载完整索引:', error);
+            }
+        }
+    }
+
+    // 与清单一样向服务器确认：过期的完整索引一旦被记成新版本，之后的增量都补不回漏掉的变化
+    const indexResp = await fetch(POSTS_INDEX_URL, { cache: 'no-cache' });
+    if (!indexResp.ok) throw new Error('无法加载日志列表');
+    const posts = await indexResp.json();
+    if (manifest) writeIndexCache(manifest.version, posts);
+    return posts;
+}
+
+// 首页、"加载更多"和搜索共用同一份索引，每个页面最多请求一次
+let postsIndexPromise = null;
+function loadPostsIndex() {
+    if (!postsIndexPromise) {
+        postsIndexPromise = fetchPostsIndex().catch(error => {
+            postsIndexPromise = null; // 失败后允许重试
+            throw error;
+        });
+    }
+    return postsIndexPromise.then(posts => posts.slice());
+}
+
+// 生成文章卡片HTML，结构与build.py中的render_post_card保持一致
+function renderPostCards(posts) {
+    let postsHTML = '';
+    for (const postMeta of posts) {
+        postsHTML += `
+            <div class="post-card" onclick="window.location.href='post.html?id=${postMeta.id}'">
+                <h3 class="post-title">${postMeta.title}</h3>
+                <span class="post-date"><i class="far fa-calendar"></i> ${postMeta.date} • <i class="far fa-clock"></i> ${postMeta.readTime}</span>
+                <p class="post-summary">${postMeta.summary}</p>
+                <a class="read-more">阅读全文 <i class="fas fa-arrow-right"></i></a>
+            </div>
+        `;
+    }
+    return postsHTML;
+}
+
+// 读取build.py嵌入页面的第一页索引数据
+function readFirstPage() {
+    const dataEl = document.getElementById('posts-first-page');
+    if (!dataEl) return null;
+    try {
+        return JSON.parse(dataEl.textContent);
+    } catch (error) {
+        console.error('❌ [Main.js] 解析内联索引失败:', error);
+        return null;
+    }
+}
+
+// 在列表末尾添加"加载更多"按钮，点击后才请求完整索引
+function addLoadMoreButton(postsListEl, shownCount) {
+    const button = document.createElement('button');
+    button.className = 'load-more';
+    button.innerHTML = '加载更多 <i class="fas fa-chevron-down"></i>';
+    button.addEventListener('click', async () => {
+        button.disabled = true;
+        button.innerHTML = '<i class="fas fa-spinner fa-spin"></i> 正在加载...';
+        try {
+            const postsIndex = sortPostsIndex(await loadPostsIndex());
+            button.remove();
+            postsListEl.insertAdjacentHTML('beforeend', renderPostCards(postsIndex.slice(shownCount)));
+        } catch (error) {
+            console.error('❌ [Main.js] 加载更多日志失败:', error);
+            button.disabled = false;
+            button.innerHTML = '加载失败，点击重试';
+        }
+    });
+    postsListEl.after(button);
+}
 
 // 主函数：在首页加载时列出所有日志
 async function loadAllPosts() {
     const postsListEl = document.getElementById('posts-list');
     if (!postsListEl) return;
 
+    // 第一页已由build.py预渲染，只在需要时再加载剩下的文章
+    const firstPage = readFirstPage();
+    if (firstPage) {
+        if (firstPage.total > firstPage.posts.length) {
+            addLoadMoreButton(postsListEl, firstPage.posts.length);
+        }
+        return;
+    }
+
     try {
         // === 新增调试代码开始 ===
         console.log('🔍 [Main.js] 函数开始执行，正在获取文章列表...');
         // === 新增调试代码结束 ===
 
-        const indexResp = await fetch(POSTS_INDEX_URL);
-        if (!indexResp.ok) throw new Error('无法加载日志列表');
-        const postsIndex = await indexResp.json();
+        const postsIndex = await loadPostsIndex();
 
         // === 新增调试代码：查看获取到的数据 ===
         console.log('✅ [Main.js] 成功获取到文章索引数据：', postsIndex);
@@ -30,20 +174,9 @@ async function loadAllPosts() {
             return;
         }
 
-        let postsHTML = '';
         // 按日期倒序排列，最新的在前
-        postsIndex.sort((a, b) => new Date(b.id) - new Date(a.id));
-
-        for (const postMeta of postsIndex) {
-            postsHTML += `
-                <div class="post-card" onclick="window.location.href='post.html?id=${postMeta.id}'">
-                    <h3 class="post-title">${postMeta.title}</h3>
-                    <span class="post-date"><i class="far fa-calendar"></i> ${postMeta.date} • <i class="far fa-clock"></i> ${postMeta.readTime}</span>
-                    <p class="post-summary">${postMeta.summary}</p>
-                    <a class="read-more">阅读全文 <i class="fas fa-arrow-right"></i></a>
-                </div>
-            `;
-        }
+        sortPostsIndex(postsIndex);
+        const postsHTML = renderPostCards(postsIndex);
 
         // === 新增调试代码：查看生成的HTML ===
         console.log('🛠️ [Main.js] 生成的HTML代码片段（前200字符）：', postsHTML.substring(0, 200));
@@ -69,7 +202,9 @@ async function loadSinglePost(postId) {
 
         // 构建完整的日志HTML
         // 注意：为了安全，如果日志内容来自用户，应进行适当的转义
-        const bodyHTML = post.body.replace(/\n/g, '<br>'); // 简单将换行转为<br>
+        // 规范化过的正文（带format字段，见canonicalize.py）可以直接使用，
+        // 旧格式的正文才需要简单将换行转为<br>
+        const bodyHTML = post.format >= 1 ? post.body : post.body.replace(/\n/g, '<br>');
 
         postContentEl.innerHTML = `
             <h1>${post.title}</h1>
@@ -81,6 +216,8 @@ async function loadSinglePost(postId) {
             <div class="post-body">
                 ${bodyHTML}
             </div>
+            ${renderBacklinks(post.backlinks)}
+            ${renderPostNav(post.nav)}
             <p style="margin-top: 2rem;">
                 <a href="index.html" class="back-link"><i class="fas fa-arrow-left"></i> 返回首页</a>
             </p>
@@ -89,12 +226,73 @@ async function loadSinglePost(postId) {
         // 更新页面标题
         document.title = `${post.title} - 我的日常手记`;
 
+        // 读者最可能接着看下一篇，空闲时让浏览器提前取回它的JSON
+        if (post.nav && post.nav.next) {
+            prefetchPost(post.nav.next.id);
+        }
+
     } catch (error) {
         console.error('加载单篇日志失败:', error);
         postContentEl.innerHTML = '<p class="error">日志加载失败或不存在。</p>';
     }
 }
 
+// 生成上一篇/下一篇和同标签相邻文章的导航（导航由build.py在发布时写入文章JSON）
+function renderPostNav(nav) {
+    if (!nav) return '';
+    const link = (item, cls, label) => item
+        ? `<a class="${cls}" href="post.html?id=${item.id}">${label}${item.title}</a>`
+        : '<span></span>';
+
+    let navHTML = `
+        <nav class="post-nav">
+            ${link(nav.prev, 'post-nav-prev', '<i class="fas fa-arrow-left"></i> 上一篇：')}
+            ${link(nav.next, 'post-nav-next', '下一篇：')}
+        </nav>
+    `;
+    for (const [tag, tagNav] of Object.entries(nav.tags || {})) {
+        navHTML += `
+            <div class="post-nav post-nav-tag">
+                <span class="tag"><i class="fas fa-tag"></i> ${tag}</span>
+                ${link(tagNav.prev, 'post-nav-prev', '上一篇：')}
+                ${link(tagNav.next, 'post-nav-next', '下一篇：')}
+            </div>
+        `;
+    }
+    return navHTML;
+}
+
+// 生成"被提及于"列表：链接到本文的其他文章（由link_graph.py在发布时写入文章JSON）
+function renderBacklinks(backlinks) {
+    if (!backlinks || backlinks.length === 0) return '';
+    const items = backlinks
+        .map(item => `<li><a href="post.html?id=${item.id}">${item.title}</a></li>`)
+        .join('');
+    return `
+        <section class="post-backlinks">
+            <h3><i class="fas fa-link"></i> 被提及于</h3>
+            <ul>${items}</ul>
+        </section>
+    `;
+}
+
+// 在浏览器空闲时预取文章JSON
+function prefetchPost(postId) {
+    const addHint = () => {
+        const hint = document.createElement('link');
+        hint.rel = 'prefetch';
+        hint.as = 'fetch';
+        hint.crossOrigin = 'anonymous';
+        hint.href = `${POSTS_DIR}${encodeURIComponent(postId)}.json`;
+        document.head.appendChild(hint);
+    };
+    if ('requestIdleCallback' in window) {
+        requestIdleCallback(addHint);
+    } else {
+        setTimeout(addHint, 1000);
+    }
+}
+
 // 主题切换功能
 async function initThemeSwitcher() {
     const themeToggle = document.getElementById('theme-toggle');
@@ -1,6 +1,7 @@
 class BlogSearch {
     constructor() {
         this.postsIndex = [];
+        this.indexPromise = null;
         this.searchInput = document.getElementById('search-input');
         this.searchResults = document.getElementById('search-results');
         
@@ -9,25 +10,29 @@ class BlogSearch {
         }
     }
     
-    async init() {
-        try {
-            await this.loadIndex();
-            this.setupEventListeners();
-            console.log('搜索功能初始化完成，加载了', this.postsIndex.length, '篇日志');
-        } catch (error) {
-            console.error('搜索功能初始化失败:', error);
+    init() {
+        // 索引等读者第一次用到搜索框时才加载，首页打开时不额外请求
+        this.setupEventListeners();
+        this.searchInput.addEventListener('focus', () => this.ensureIndex(), { once: true });
+        console.log('搜索功能初始化完成');
+    }
+    
+    ensureIndex() {
+        if (!this.indexPromise) {
+            this.indexPromise = this.loadIndex();
         }
+        return this.indexPromise;
     }
     
     async loadIndex() {
         try {
-            const response = await fetch('posts_index.json');
-            if (!response.ok) throw new Error('无法加载日志索引');
-            
-            this.postsIndex = await response.json();
+            // 与main.js共用索引：按版本增量更新，同一页面只请求一次
+            this.postsIndex = await loadPostsIndex();
             console.log('成功加载日志索引:', this.postsIndex);
+            return true;
         } catch (error) {
             console.error('加载搜索索引失败:', error);
+            this.indexPromise = null; // 下次输入时重试
             // 如果失败，显示错误信息
             if (this.searchResults) {
                 this.searchResults.innerHTML = `
@@ -36,6 +41,7 @@ class BlogSearch {
                     </div>
                 `;
             }
+            return false;
         }
     }
     
@@ -44,8 +50,10 @@ class BlogSearch {
         let timeout;
         this.searchInput.addEventListener('input', (e) => {
             clearTimeout(timeout);
-            timeout = setTimeout(() => {
-                this.performSearch(e.target.value.trim());
+            timeout = setTimeout(async () => {
+                if (await this.ensureIndex()) {
+                    this.performSearch(e.target.value.trim());
+                }
             }, 300);
         });
         
@@ -160,16 +168,5 @@ class BlogSearch {
 
 // 页面加载后初始化搜索功能
 document.addEventListener('DOMContentLoaded', () => {
-    // 确保 posts_index.json 存在
-    fetch('posts_index.json')
-        .then(response => {
-            if (response.ok) {
-                new BlogSearch();
-            } else {
-                console.warn('posts_index.json 不存在或无法访问');
-            }
-        })
-        .catch(error => {
-            console.error('检查索引文件失败:', error);
-        });
+    new BlogSearch();
 });
\ No newline at end of file
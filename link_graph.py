@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+文章链接图
+收集每篇文章正文中指向其他文章的链接（post.html?id=...）和引用的图片，
+链接图增量保存在构建缓存中：只有文件变化过的文章才会重新解析。
+根据链接图把"被提及于"（backlinks）写入被链接文章的JSON，只改写列表有变化的文章；
+并报告指向不存在文章的链接、不存在的图片，以及 images/ 中没有被引用的图片。
+"""
+
+import re
+import sys
+import html
+import argparse
+from pathlib import Path
+from urllib.parse import urlsplit, parse_qs
+
+from build import POSTS_DIR, IMG_SRC_RE, load_post, save_post, is_external, local_path
+from build_cache import load_cache, save_cache, file_signature
+from index_store import iter_index
+
+# ========== 配置区域 ==========
+IMAGES_DIR = Path("./images")
+PAGE_FILES = [Path("./index.html"), Path("./post.html")]  # 页面模板中引用的图片也算被引用
+
+HREF_RE = re.compile(r'''<a\b[^>]*?\bhref\s*=\s*(["'])(.*?)\1''', re.IGNORECASE | re.DOTALL)
+
+
+# =============================
+
+def linked_post_id(href):
+    """post.html?id=xxx -> xxx；不是站内文章链接时返回None"""
+    href = html.unescape(href)
+    if is_external(href):
+        return None
+    parts = urlsplit(href)
+    if parts.path.rsplit('/', 1)[-1] != 'post.html':
+        return None
+    ids = parse_qs(parts.query).get('id')
+    return ids[0] if ids else None
+
+
+def local_image(src):
+    """把图片地址解析为仓库中的相对路径（如 images/a.jpg），外部图片返回None"""
+    path = local_path(html.unescape(src))
+    return path.as_posix() if path is not None else None
+
+
+def extract_refs(body):
+    """从正文HTML中提取 (链接到的文章ID列表, 引用的本地图片列表)"""
+    links = set()
+    for match in HREF_RE.finditer(body):
+        post_id = linked_post_id(match.group(2))
+        if post_id:
+            links.add(post_id)
+    images = set()
+    for match in IMG_SRC_RE.finditer(body):
+        image = local_image(match.group(3))
+        if image:
+            images.add(image)
+    return sorted(links), sorted(images)
+
+
+def update_link_graph():
+    """
+    增量更新链接图，把backlinks写入文章JSON。
+    返回 (被改写的文件列表, 链接图 {文章ID: {'links': [...], 'images': [...]}})
+    """
+    cache = load_cache('links')
+    old_nodes = cache.get('posts', {})
+    old_backlinks = cache.get('backlinks', {})
+
+    nodes = {}
+    order = []  # 日期升序
+    titles = {}
+    reloaded = {}  # 本次重新解析过的文章
+    for entry in iter_index():
+        post_id = entry['id']
+        order.append(post_id)
+        titles[post_id] = entry.get('title', '')
+        path = POSTS_DIR / f"{post_id}.json"
+        if not path.exists():
+            continue
+        signature = file_signature(path)
+        node = old_nodes.get(post_id)
+        if node is None or node['stat'] != signature:
+            post = load_post(path)
+            links, images = extract_refs(post.get('body', ''))
+            node = {'stat': signature, 'links': links, 'images': images}
+            reloaded[post_id] = post
+        nodes[post_id] = node
+
+    # 被提及于：最新的文章在前
+    backlinks = {}
+    for source in reversed(order):
+        for target in nodes.get(source, {}).get('links', ()):
+            if target != source and target in nodes:
+                backlinks.setdefault(target, []).append({'id': source, 'title': titles[source]})
+
+    changed = []
+    for post_id, node in nodes.items():
+        mentions = backlinks.get(post_id, [])
+        post = reloaded.get(post_id)
+        if post is None:
+            if old_backlinks.get(post_id, []) == mentions:
+                continue
+            post = load_post(POSTS_DIR / f"{post_id}.json")
+        if post.get('backlinks', []) == mentions:
+            continue
+        if mentions:
+            post['backlinks'] = mentions
+        else:
+            post.pop('backlinks', None)
+        path = POSTS_DIR / f"{post_id}.json"
+        save_post(post, path)
+        node['stat'] = file_signature(path)
+        changed.append(path)
+
+    save_cache('links', {'posts': nodes, 'backlinks': backlinks})
+    return changed, nodes
+
+
+def _page_images():
+    """页面模板中直接引用的本地图片"""
+    images = set()
+    for page in PAGE_FILES:
+        if page.exists():
+            for match in IMG_SRC_RE.finditer(page.read_text(encoding='utf-8')):
+                image = local_image(match.group(3))
+                if image:
+                    images.add(image)
+    return images
+
+
+def find_problems(nodes):
+    """
+    返回 (断开的链接 [(文章, 目标ID)], 不存在的图片 [(文章, 图片)], 没有被引用的图片 [路径])
+    """
+    dangling = [(source, target) for source, node in nodes.items()
+                for target in node['links'] if target not in nodes]
+    missing = [(source, image) for source, node in nodes.items()
+               for image in node['images'] if not Path(image).is_file()]
+    referenced = _page_images()
+    for node in nodes.values():
+        referenced.update(node['images'])
+    unreferenced = []
+    if IMAGES_DIR.exists():
+        unreferenced = sorted(path.as_posix() for path in IMAGES_DIR.rglob('*')
+                              if path.is_file() and path.as_posix() not in referenced)
+    return dangling, missing, unreferenced
+
+
+def print_problems(nodes):
+    """打印链接检查结果，返回问题数（没有被引用的图片只提示，不算问题）"""
+    dangling, missing, unreferenced = find_problems(nodes)
+    for source, target in dangling:
+        print(f"警告：{source} 链接到不存在的文章 {target}")
+    for source, image in missing:
+        print(f"警告：{source} 引用的图片 {image} 不存在")
+    if unreferenced:
+        print(f"提示：images/ 中有 {len(unreferenced)} 张图片没有被任何文章引用：")
+        for path in unreferenced:
+            print(f"  {path}")
+    return len(dangling) + len(missing)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='更新文章间的反向链接，检查断开的链接和没有用到的图片')
+    parser.add_argument('--check', action='store_true', help='有断开的链接或缺失的图片时以非零状态退出')
+    args = parser.parse_args()
+
+    changed, nodes = update_link_graph()
+    total_links = sum(len(node['links']) for node in nodes.values())
+    print(f"✅ {len(nodes)} 篇文章，{total_links} 个站内链接，更新了 {len(changed)} 篇文章的反向链接")
+    problems = print_problems(nodes)
+    if problems and args.check:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,76 +6,36 @@
 功能：读取Markdown文件，自动生成JSON并更新索引
 """
 
-import os
-import json
-import re
 import sys
-import datetime
+import re
 from pathlib import Path
-import subprocess
 import argparse
 
+from blog_core import (parse_front_matter, generate_post_id, apply_defaults, new_post,
+                       publish_post, push_to_github, print_manual_push)
+from highlight import highlight_block, save_highlight_cache
+
 # ========== 配置区域 ==========
-# 请根据你的项目结构调整这些路径
-POSTS_DIR = Path("./posts")  # 存放文章JSON的文件夹
-INDEX_FILE = Path("./posts_index.json")  # 文章索引文件
+REQUIRED_FIELDS = ['title', 'summary']  # Front Matter中的必要字段
 
 
 # =============================
 
-def parse_front_matter(content):
-    """
-    解析Markdown文件顶部的Front Matter（YAML格式）
-    格式示例：
-    ---
-    title: 我的新文章
-    date: 2024年5月22日
-    readTime: 3分钟阅读
-    mood: 开心
-    tags: [生活, 随笔]
-    summary: 这是一篇文章的简要摘要。
-    ---
-    """
-    lines = content.split('\n')
-    if not lines[0].strip() == '---':
-        raise ValueError("Markdown文件必须以Front Matter（以---开始）开头")
-
-    front_matter = []
-    for line in lines[1:]:
-        if line.strip() == '---':
-            break
-        front_matter.append(line)
-
-    # 简单解析YAML（为简化，这里不使用完整YAML解析器）
-    metadata = {}
-    for line in front_matter:
-        if ':' in line:
-            key, value = line.split(':', 1)
-            key = key.strip()
-            value = value.strip()
-
-            # 处理标签数组
-            if key == 'tags':
-                # 移除括号和引号，按逗号分割
-                tags = value.strip('[]').split(',')
-                metadata[key] = [tag.strip().strip("'\" ") for tag in tags]
-            else:
-                metadata[key] = value
-
-    # 提取正文（Front Matter之后的内容）
-    body_start = content.find('---\n') + 4
-    if body_start == 3:  # 没找到
-        body_start = content.find('---\r\n') + 5
-    body = content[body_start:].strip()
-
-    return metadata, body
-
-
 def markdown_to_html(text):
     """
     将Markdown基本语法转换为HTML
     （这是一个简化版，可替换为更强大的库如markdown2）
     """
+    # 先把代码块取出来单独高亮，用占位符代替，避免其中的内容被后面的规则改写
+    code_blocks = []
+
+    def stash_code_block(match):
+        code_blocks.append(highlight_block(match.group(2), match.group(1)))
+        return f'\n\n\x00CODE{len(code_blocks) - 1}\x00\n\n'
+
+    text = re.sub(r'^```[ \t]*([\w+#-]*)[^\n]*\n(.*?)\n```[ \t]*$', stash_code_block,
+                  text, flags=re.DOTALL | re.MULTILINE)
+
     # 处理标题
     text = re.sub(r'^### (.+)$', r'<h3>\1</h3>', text, flags=re.MULTILINE)
     text = re.sub(r'^## (.+)$', r'<h2>\1</h2>', text, flags=re.MULTILINE)
@@ -88,16 +48,12 @@ def markdown_to_html(text):
     # 处理列表
     text = re.sub(r'^\* (.+)$', r'<li>\1</li>', text, flags=re.MULTILINE)
 
-    # 处理代码块（简单处理）
-    text = re.sub(r'```(\w+)?\n(.+?)\n```', r'<pre><code>\2</code></pre>',
-                  text, flags=re.DOTALL)
-
     # 处理行内代码
     text = re.sub(r'`([^`]+)`', r'<code>\1</code>', text)
 
     # 处理图片 ![alt](url)
     text = re.sub(r'!\[([^\]]*)\]\(([^)]+)\)',
-                  r'<img src="\2" alt="\1" style="max-width:100%;">', text)
+                  r'<img src="\2" alt="\1" class="img-fluid">', text)
 
     # 处理链接 [text](url)
     text = re.sub(r'\[([^\]]+)\]\(([^)]+)\)', r'<a href="\2">\1</a>', text)
@@ -108,52 +64,31 @@ def markdown_to_html(text):
     for p in paragraphs:
         p = p.strip()
         if p:
-            # 如果已经是列表项，不包裹<p>
-            if p.startswith('<li>') or p.startswith('<pre>') or p.startswith('<h'):
+            # 如果已经是列表项或代码块，不包裹<p>
+            if p.startswith('<li>') or p.startswith('\x00CODE') or p.startswith('<h'):
                 html_paragraphs.append(p)
             else:
                 html_paragraphs.append(f'<p>{p}</p>')
 
-    return '\n'.join(html_paragraphs)
+    # 放回高亮好的代码块
+    return re.sub(r'\x00CODE(\d+)\x00', lambda m: code_blocks[int(m.group(1))],
+                  '\n'.join(html_paragraphs))
 
 
-def generate_post_id(title):
+def build_post(content):
     """
-    根据标题生成文章ID（用于文件名）
-    格式：YYYY-MM-DD-标题的英文或拼音
+    把Markdown文件内容转换为文章数据（正文为规范化的HTML）。
+    Front Matter格式错误或缺少必要字段时抛出ValueError
     """
-    today = datetime.date.today().strftime("%Y-%m-%d")
-    # 简单中文转拼音（此处为示意，实际可用pypinyin库）
-    # 这里先用标题的英文或拼音，为简化先用数字
-    import random
-    random_str = str(random.randint(1000, 9999))
-    # 移除特殊字符，用连字符连接
-    safe_title = re.sub(r'[^\w\s-]', '', title).strip().lower()
-    safe_title = re.sub(r'[-\s]+', '-', safe_title)
-
-    # 如果标题转换后为空，使用随机数
-    if not safe_title or len(safe_title) > 50:
-        safe_title = random_str
-
-    return f"{today}-{safe_title}"
-
-
-def load_json_file(filepath):
-    """安全地加载JSON文件"""
-    if not os.path.exists(filepath):
-        return [] if 'index' in str(filepath).lower() else {}
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        print(f"警告：{filepath} 不是有效的JSON，将创建新文件")
-        return [] if 'index' in str(filepath).lower() else {}
-
+    metadata, body = parse_front_matter(content)
+    for field in REQUIRED_FIELDS:
+        if not metadata.get(field):
+            raise ValueError(f"Front Matter中缺少必要字段 '{field}' 或其值为空")
+    apply_defaults(metadata)
 
-def save_json_file(data, filepath):
-    """保存JSON文件（带格式化）"""
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    html_body = markdown_to_html(body)
+    save_highlight_cache()
+    return new_post(generate_post_id(metadata['title']), metadata, html_body)
 
 
 def main():
@@ -185,85 +120,31 @@ def main():
         print(f"读取文件失败: {e}")
         sys.exit(1)
 
-    # 2. 解析Front Matter
+    # 2. 解析Front Matter，转换Markdown为HTML，并规范化（压缩空白等，浏览器端无需再处理）
     try:
-        metadata, body = parse_front_matter(content)
-    except Exception as e:
+        post = build_post(content)
+    except ValueError as e:
         print(f"解析Front Matter失败: {e}")
         print("请确保文件以正确的Front Matter格式开头（前后有---）")
         sys.exit(1)
-
-    # 检查必要字段
-    required_fields = ['title', 'summary']
-    for field in required_fields:
-        if field not in metadata:
-            print(f"错误：Front Matter中缺少必要字段 '{field}'")
-            sys.exit(1)
-
-    # 设置默认值
-    if 'date' not in metadata:
-        today_cn = datetime.date.today().strftime("%Y年%-m月%-d日")
-        metadata['date'] = today_cn
-
-    if 'readTime' not in metadata:
-        metadata['readTime'] = "3分钟阅读"
-
-    if 'mood' not in metadata:
-        metadata['mood'] = "平静"
-
-    if 'tags' not in metadata:
-        metadata['tags'] = ["随笔"]
-
-    print(f"✅ 解析成功: 《{metadata['title']}》")
-
-    # 3. 转换Markdown为HTML
-    html_body = markdown_to_html(body)
+    print(f"✅ 解析成功: 《{post['title']}》")
     print("✅ Markdown已转换为HTML")
 
-    # 4. 生成文章ID和文件名
-    post_id = generate_post_id(metadata['title'])
-    json_filename = f"{post_id}.json"
-    json_path = POSTS_DIR / json_filename
-
-    # 确保posts目录存在
-    POSTS_DIR.mkdir(exist_ok=True)
-
-    # 5. 创建文章详情JSON
-    post_detail = {
-        "id": post_id,
-        "title": metadata['title'],
-        "date": metadata['date'],
-        "readTime": metadata['readTime'],
-        "mood": metadata['mood'],
-        "tags": metadata['tags'],
-        "summary": metadata['summary'],
-        "body": html_body
-    }
-
-    save_json_file(post_detail, json_path)
-    print(f"📄 文章详情已保存: {json_path}")
-
-    # 6. 更新文章索引
-    index_data = load_json_file(INDEX_FILE)
-
-    # 创建索引条目（不包含body）
-    index_entry = {k: v for k, v in post_detail.items() if k != 'body'}
-
-    # 添加到索引开头（最新文章在前）
-    index_data.insert(0, index_entry)
-
-    save_json_file(index_data, INDEX_FILE)
-    print(f"📚 文章索引已更新: {INDEX_FILE}")
+    # 3. 保存文章，更新索引（只改动NDJSON中的一行），导出网站使用的索引，
+    #    再增量构建：更新受影响文章的导航，第一页有变化时重新预渲染首页
+    publish_files = publish_post(post)
+    for path in publish_files:
+        print(f"📄 已更新: {path}")
 
     print("\n" + "=" * 50)
     print("✅ 文章发布成功！")
-    print(f"文章ID: {post_id}")
-    print(f"标题: {metadata['title']}")
-    print(f"日期: {metadata['date']}")
-    print(f"标签: {', '.join(metadata['tags'])}")
+    print(f"文章ID: {post['id']}")
+    print(f"标题: {post['title']}")
+    print(f"日期: {post['date']}")
+    print(f"标签: {', '.join(post['tags'])}")
     print("=" * 50)
 
-    # 7. 可选：推送到GitHub
+    # 4. 可选：推送到GitHub
     should_push = args.push
     if args.no_push:
         should_push = False
@@ -276,44 +157,12 @@ def main():
             should_push = False
             print("\n操作已取消")
 
+    commit_msg = f"发布新文章: {post['title']}"
     if should_push:
-        print("\n🚀 正在推送到GitHub...")
-        try:
-            # 添加文件
-            subprocess.run(['git', 'add', str(json_path), str(INDEX_FILE)],
-                           check=True, capture_output=True, text=True)
-
-            # 提交
-            commit_msg = f"发布新文章: {metadata['title']}"
-            subprocess.run(['git', 'commit', '-m', commit_msg],
-                           check=True, capture_output=True, text=True)
-
-            # 推送
-            result = subprocess.run(['git', 'push'],
-                                    capture_output=True, text=True)
-
-            if result.returncode == 0:
-                print("✅ 已成功推送到GitHub！")
-                print("📢 等待约1-2分钟，GitHub Pages会自动部署更新。")
-                print(f"🌐 访问: https://你的用户名.github.io")
-            else:
-                print("⚠️  推送失败，请检查Git配置:")
-                print(result.stderr)
-
-        except subprocess.CalledProcessError as e:
-            print(f"❌ Git操作失败: {e}")
-            print("请确保：")
-            print("1. 当前目录是Git仓库")
-            print("2. Git已正确配置")
-            print("3. 你有推送权限")
-        except FileNotFoundError:
-            print("❌ Git未安装或不在PATH中")
+        push_to_github(publish_files, commit_msg)
     else:
         print("\n📝 本地文件已更新完成。")
-        print("你可以稍后手动执行以下命令推送到GitHub：")
-        print(f"  git add {json_path} {INDEX_FILE}")
-        print(f'  git commit -m "发布新文章: {metadata["title"]}"')
-        print("  git push")
+        print_manual_push(publish_files, commit_msg)
 
 
 if __name__ == '__main__':
@@ -4,6 +4,8 @@ from tkinter import filedialog, messagebox, scrolledtext
 import subprocess
 import os
 
+import blog_core
+
 
 class BlogPublisherGUI:
     def __init__(self, root):
@@ -66,18 +68,17 @@ class BlogPublisherGUI:
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 content = f.read()
-                # 提取标题用于预览
-                lines = content.split('\n')
-                title = "无标题"
-                for line in lines[:10]:  # 只检查前10行
-                    if line.startswith('title:'):
-                        title = line.split(':', 1)[1].strip()
-                        break
-
-                self.preview_text.delete(1.0, tk.END)
-                self.preview_text.insert(1.0, f"标题: {title}\n\n")
-                self.preview_text.insert(tk.END, content[:500] + ("..." if len(content) > 500 else ""))
-                self.status_var.set(f"已加载: {os.path.basename(filepath)}")
+            # 用与发布相同的解析规则提取标题和正文用于预览
+            metadata, body = blog_core.parse_front_matter(content, required=False)
+            title = metadata.get('title') or "无标题"
+            tags = metadata.get('tags') or []
+
+            self.preview_text.delete(1.0, tk.END)
+            self.preview_text.insert(1.0, f"标题: {title}\n")
+            if tags:
+                self.preview_text.insert(tk.END, f"标签: {', '.join(tags)}\n")
+            self.preview_text.insert(tk.END, "\n" + body[:500] + ("..." if len(body) > 500 else ""))
+            self.status_var.set(f"已加载: {os.path.basename(filepath)}")
         except Exception as e:
             messagebox.showerror("错误", f"读取文件失败: {e}")
 
@@ -95,20 +96,26 @@ class BlogPublisherGUI:
         self.root.update()
 
         try:
-            # 调用原有的发布脚本
-            cmd = ["python", "publish.py", filepath, "--push"]
-            result = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8')
+            # Markdown转换会用到构建和高亮模块，发布时才导入，界面启动更快
+            from publish import build_post
+
+            with open(filepath, 'r', encoding='utf-8') as f:
+                post = build_post(f.read())
+            publish_files = blog_core.publish_post(post)
 
-            if result.returncode == 0:
+            if blog_core.push_to_github(publish_files, f"发布新文章: {post['title']}"):
                 messagebox.showinfo("成功", "文章发布成功！")
                 self.status_var.set("发布成功")
                 # 清空当前文件路径
                 self.file_path.set("")
                 self.preview_text.delete(1.0, tk.END)
             else:
-                messagebox.showerror("发布失败", f"错误信息:\n{result.stderr}")
-                self.status_var.set("发布失败")
+                messagebox.showwarning("推送失败", "文章已在本地发布，但推送到GitHub失败，请查看终端输出。")
+                self.status_var.set("已本地发布，推送失败")
 
+        except ValueError as e:
+            messagebox.showerror("发布失败", f"错误信息:\n{e}")
+            self.status_var.set("发布失败")
         except Exception as e:
             messagebox.showerror("错误", f"发布过程异常: {e}")
             self.status_var.set("错误")
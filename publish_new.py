@@ -8,14 +8,15 @@
 
 import os
 import json
-import datetime
 import sys
-from pathlib import Path
 import subprocess
 
+from blog_core import (PostCatalog, generate_post_id, format_date_cn, new_post, post_path,
+                       publish_post, push_to_github, print_manual_push, DEFAULT_TAGS, POSTS_DIR)
+from index_store import INDEX_NDJSON
+
 # ========== 配置 ==========
-POSTS_DIR = Path("./posts")
-INDEX_FILE = Path("./posts_index.json")
+MOODS = ["开心", "平静", "思考", "兴奋", "怀念", "期待", "放松", "其他"]
 
 
 # ==========================
@@ -41,26 +42,6 @@ def ask_question(question, default="", required=True):
         return answer
 
 
-def generate_post_id(title):
-    """生成文章ID"""
-    today = datetime.date.today().strftime("%Y-%m-%d")
-
-    # 简单处理中文标题：转为拼音或使用日期+序号
-    import re
-    import random
-
-    # 移除所有非字母数字字符，用连字符连接
-    title_slug = re.sub(r'[^\w\u4e00-\u9fff\s-]', '', title)  # 保留中文
-    title_slug = re.sub(r'[-\s]+', '-', title_slug)
-    title_slug = title_slug.lower()
-
-    # 如果转换后为空或太长，使用日期和随机数
-    if not title_slug or len(title_slug) > 50:
-        title_slug = f"post-{random.randint(1000, 9999)}"
-
-    return f"{today}-{title_slug}"
-
-
 def edit_content_interactively():
     """交互式编辑文章正文"""
     print("\n" + "=" * 50)
@@ -98,7 +79,7 @@ def ask_tags():
     tags_input = input("标签: ").strip()
 
     if not tags_input:
-        return ["随笔"]
+        return list(DEFAULT_TAGS)
 
     # 支持逗号或空格分隔
     if ',' in tags_input:
@@ -131,20 +112,11 @@ def ask_image():
         image_url = input("请输入图片URL: ").strip()
         if image_url:
             alt_text = input("图片描述文字: ").strip() or "文章配图"
-            return f'\n<img src="{image_url}" alt="{alt_text}" style="max-width:100%;border-radius:8px;margin:1rem 0;">\n'
+            return f'\n<img src="{image_url}" alt="{alt_text}" class="img-fluid rounded spaced">\n'
 
     return ""
 
 
-def get_today_date():
-    """获取今天日期（兼容Windows的格式）"""
-    today = datetime.date.today()
-    # Windows兼容的日期格式：去掉前导零
-    month = str(today.month)
-    day = str(today.day)
-    return f"{today.year}年{month}月{day}日"
-
-
 def create_post():
     """主函数：创建新文章"""
     print("\n" + "=" * 50)
@@ -158,20 +130,19 @@ def create_post():
     title = ask_question("文章标题", required=True)
 
     # 自动生成日期，但允许修改（使用兼容Windows的格式）
-    today_cn = get_today_date()
+    today_cn = format_date_cn()
     date = ask_question("发布日期", today_cn)
 
     readTime = ask_question("阅读时长", "3分钟阅读")
 
     # 心情选择
     print("\n😊 选择心情：")
-    moods = ["开心", "平静", "思考", "兴奋", "怀念", "期待", "放松", "其他"]
-    for i, mood in enumerate(moods, 1):
+    for i, mood in enumerate(MOODS, 1):
         print(f"  {i}. {mood}")
 
-    mood_choice = input(f"请选择 (1-{len(moods)}, 默认1): ").strip()
-    if mood_choice.isdigit() and 1 <= int(mood_choice) <= len(moods):
-        mood = moods[int(mood_choice) - 1]
+    mood_choice = input(f"请选择 (1-{len(MOODS)}, 默认1): ").strip()
+    if mood_choice.isdigit() and 1 <= int(mood_choice) <= len(MOODS):
+        mood = MOODS[int(mood_choice) - 1]
     else:
         mood = ask_question("自定义心情", "平静")
 
@@ -199,25 +170,17 @@ def create_post():
         else:
             body += image_html
 
-    # 5. 生成文章ID和文件
+    # 5. 生成文章ID和文章数据
     post_id = generate_post_id(title)
-    json_filename = f"{post_id}.json"
-    json_path = POSTS_DIR / json_filename
-
-    # 确保目录存在
-    POSTS_DIR.mkdir(exist_ok=True)
-
-    # 6. 创建文章详情JSON
-    post_detail = {
-        "id": post_id,
+    json_path = post_path(post_id)
+    post_detail = new_post(post_id, {
         "title": title,
         "date": date,
         "readTime": readTime,
         "mood": mood,
         "tags": tags,
         "summary": summary,
-        "body": body.replace('\n', '<br>')
-    }
+    }, body)
 
     # 7. 预览确认
     print("\n" + "=" * 50)
@@ -236,88 +199,31 @@ def create_post():
         print("❌ 发布取消")
         return
 
-    # 8. 保存文件
+    # 8. 保存文章并更新索引：只改动NDJSON中的一行，再导出网站使用的JSON和增量文件，
+    #    增量构建：更新受影响文章的导航，第一页有变化时重新预渲染首页
     try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(post_detail, f, ensure_ascii=False, indent=2)
-        print(f"✅ 文章已保存: {json_path}")
+        publish_files = publish_post(post_detail)
+        for path in publish_files:
+            print(f"✅ 已更新: {path}")
     except Exception as e:
-        print(f"❌ 保存文件失败: {e}")
+        print(f"❌ 发布失败: {e}")
+        if json_path.exists():
+            # 文章已保存，提供手动更新索引的指南
+            index_entry = {k: v for k, v in post_detail.items() if k != 'body'}
+            print(f"\n📝 请手动在 {INDEX_NDJSON} 中按日期顺序添加以下一行：")
+            print(json.dumps(index_entry, ensure_ascii=False, separators=(',', ':')))
         return
 
-    # 9. 更新索引
-    try:
-        if INDEX_FILE.exists():
-            with open(INDEX_FILE, 'r', encoding='utf-8') as f:
-                index_data = json.load(f)
-        else:
-            index_data = []
-
-        # 创建索引条目（不包含body）
-        index_entry = {k: v for k, v in post_detail.items() if k != 'body'}
-        index_data.insert(0, index_entry)  # 最新文章在最前面
-
-        with open(INDEX_FILE, 'w', encoding='utf-8') as f:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
-        print(f"✅ 文章索引已更新: {INDEX_FILE}")
-
-    except Exception as e:
-        print(f"⚠️  更新索引失败，需要手动更新: {e}")
-        # 提供手动更新指南
-        print("\n📝 请手动更新 posts_index.json，添加以下内容：")
-        print(json.dumps(index_entry, ensure_ascii=False, indent=2))
-
-    # 10. 询问是否推送到GitHub
+    # 9. 询问是否推送到GitHub
     print("\n" + "=" * 50)
     push_choice = input("是否立即推送到GitHub？(y/N): ").strip().lower()
 
+    commit_msg = f"发布新文章: {title}"
     if push_choice == 'y':
-        push_to_github(json_path, title)
+        push_to_github(publish_files, commit_msg)
     else:
         print("\n📝 本地发布完成！")
-        print("你可以稍后手动执行以下命令推送到GitHub：")
-        print(f"  git add {json_path} {INDEX_FILE}")
-        print(f'  git commit -m "发布新文章: {title}"')
-        print("  git push")
-
-
-def push_to_github(json_path, title):
-    """推送到GitHub"""
-    print("\n🚀 正在推送到GitHub...")
-    try:
-        # 添加文件
-        subprocess.run(['git', 'add', str(json_path), str(INDEX_FILE)],
-                       check=True, capture_output=True, text=True)
-
-        # 提交
-        commit_msg = f"发布新文章: {title}"
-        subprocess.run(['git', 'commit', '-m', commit_msg],
-                       check=True, capture_output=True, text=True)
-
-        # 推送
-        result = subprocess.run(['git', 'push'],
-                                capture_output=True, text=True)
-
-        if result.returncode == 0:
-            print("✅ 已成功推送到GitHub！")
-            print("📢 等待约1-2分钟，GitHub Pages会自动部署更新。")
-            print(f"🌐 访问: https://你的用户名.github.io")
-        else:
-            print("⚠️  推送失败:")
-            print(result.stderr[:200])  # 只显示前200字符
-            print("\n💡 你可以稍后手动执行:")
-            print(f"  git add {json_path} {INDEX_FILE}")
-            print(f'  git commit -m "发布新文章: {title}"')
-            print("  git push")
-
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Git操作失败: {e}")
-        print("请确保：")
-        print("1. 当前目录是Git仓库")
-        print("2. Git已正确配置")
-    except FileNotFoundError:
-        print("❌ Git未安装或不在PATH中")
-        print("你可以稍后手动推送")
+        print_manual_push(publish_files, commit_msg)
 
 
 def edit_existing_post():
@@ -328,24 +234,19 @@ def edit_existing_post():
         print("❌ posts目录不存在")
         return
 
-    # 列出所有文章
-    posts = list(POSTS_DIR.glob("*.json"))
+    # 从索引列出所有文章（最新的在前），不需要逐个读取文章文件
+    posts = PostCatalog.load().newest()
     if not posts:
         print("❌ 没有找到文章")
         return
 
     print("\n现有文章：")
-    for i, post_file in enumerate(posts, 1):
-        try:
-            with open(post_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            title = data.get('title', '无标题')
-            # 缩短长标题
-            if len(title) > 30:
-                title = title[:27] + "..."
-            print(f"{i}. {title} ({post_file.name})")
-        except:
-            print(f"{i}. {post_file.name} (读取失败)")
+    for i, post in enumerate(posts, 1):
+        title = post.title or '无标题'
+        # 缩短长标题
+        if len(title) > 30:
+            title = title[:27] + "..."
+        print(f"{i}. {title} ({post.date})")
 
     choice = input(f"\n选择要编辑的文章 (1-{len(posts)}, 输入0取消): ").strip()
     if choice == "0":
@@ -354,7 +255,10 @@ def edit_existing_post():
         print("❌ 选择无效")
         return
 
-    post_file = posts[int(choice) - 1]
+    post_file = post_path(posts[int(choice) - 1].id)
+    if not post_file.exists():
+        print(f"❌ 文章文件 {post_file} 不存在")
+        return
     print(f"编辑: {post_file.name}")
 
     # 这里可以添加编辑逻辑，暂时只打开文件
@@ -405,33 +309,29 @@ def show_stats():
     print("\n📊 文章统计")
     print("-" * 30)
 
-    if not INDEX_FILE.exists():
+    if not INDEX_NDJSON.exists():
         print("❌ 索引文件不存在")
         return
 
     try:
-        with open(INDEX_FILE, 'r', encoding='utf-8') as f:
-            index_data = json.load(f)
+        catalog = PostCatalog.load()
 
-        print(f"文章总数: {len(index_data)}篇")
+        print(f"文章总数: {len(catalog)}篇")
 
         # 标签统计
-        tag_count = {}
-        for post in index_data:
-            for tag in post.get('tags', []):
-                tag_count[tag] = tag_count.get(tag, 0) + 1
-
+        tag_count = catalog.tag_counts()
         if tag_count:
             print("\n🏷️ 标签统计:")
-            for tag, count in sorted(tag_count.items(), key=lambda x: x[1], reverse=True)[:10]:
+            for tag, count in tag_count.most_common(10):
                 print(f"  {tag}: {count}篇")
 
         # 最新文章
-        if index_data:
-            latest = index_data[0]
-            print(f"\n📅 最新文章: {latest.get('title', '无标题')}")
-            print(f"   发布时间: {latest.get('date', '未知')}")
-            print(f"   标签: {', '.join(latest.get('tags', []))}")
+        latest = catalog.newest(1)
+        if latest:
+            latest = latest[0]
+            print(f"\n📅 最新文章: {latest.title or '无标题'}")
+            print(f"   发布时间: {latest.date or '未知'}")
+            print(f"   标签: {', '.join(latest.tags)}")
 
     except Exception as e:
         print(f"❌ 读取统计失败: {e}")